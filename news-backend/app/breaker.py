@@ -0,0 +1,56 @@
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing, and probes it again with backoff.
+
+    Closed, every call goes through. After `failure_threshold` consecutive failures
+    the breaker opens for `open_seconds`; once that has passed it is half-open and
+    lets one probe through. A successful probe closes it again, a failed one
+    reopens it for twice as long, up to `max_open_seconds`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        open_seconds: float = 60.0,
+        max_open_seconds: float = 30 * 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._open_for == 0.0:
+            return CLOSED
+        if self._clock() - self._opened_at < self._open_for:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self) -> bool:
+        return self.state != OPEN
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._open_for = 0.0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._open_for:
+            # a failed probe: back off further
+            self._open_for = min(self._open_for * 2, self.max_open_seconds)
+        elif self._failures >= self.failure_threshold:
+            self._open_for = self.open_seconds
+        else:
+            return
+        self._opened_at = self._clock()
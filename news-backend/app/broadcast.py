@@ -0,0 +1,71 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Set
+
+from pydantic import TypeAdapter
+
+from app.models import NewsItem
+from app.snapshot import NewsSnapshot
+
+_news_items = TypeAdapter(List[NewsItem])
+
+class NewsBroadcaster:
+    """Fans newly ingested articles out to every connected stream client.
+
+    The refresher is the single producer. Each batch is encoded as a Server-Sent
+    Events message once and the same string is queued for every client; each
+    client's queue is bounded, and a client too slow to keep up loses its oldest
+    messages rather than holding back everyone else.
+
+    An article is announced only the first time its URL is seen. The last
+    `seen_size` URLs are remembered, so entries that leave a snapshot and come
+    back (a feed dropped as stale and recovered, stored articles replaced by
+    live ones, an entry rotated out and back in) are not sent again.
+    """
+
+    def __init__(self, queue_size: int = 16, seen_size: int = 4096):
+        self.queue_size = queue_size
+        self.seen_size = seen_size
+        self._subscribers: Set["asyncio.Queue[str]"] = set()
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @contextmanager
+    def subscribe(self) -> Iterator["asyncio.Queue[str]"]:
+        queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def publish(self, items: Sequence[NewsItem], event_id: Optional[int] = None) -> None:
+        if not items or not self._subscribers:
+            return
+        message = f"event: news\ndata: {_news_items.dump_json(list(items)).decode()}\n"
+        if event_id is not None:
+            message += f"id: {event_id}\n"
+        message += "\n"
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def on_snapshot(self, previous: NewsSnapshot, current: NewsSnapshot) -> None:
+        """Publish the articles of `current` whose URL has not been seen before"""
+        # URLs are recorded even with nobody connected, so a later client is not sent old articles
+        self._remember(previous.latest.items)
+        new_items = [item for item in current.latest.items if item.url not in self._seen]
+        self._remember(current.latest.items)
+        self.publish(new_items, current.version)
+
+    def _remember(self, items: Sequence[NewsItem]) -> None:
+        for item in items:
+            self._seen[item.url] = None
+            self._seen.move_to_end(item.url)
+        while len(self._seen) > self.seen_size:
+            self._seen.popitem(last=False)
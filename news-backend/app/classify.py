@@ -0,0 +1,221 @@
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("rules", "vector")
+
+def _engine(name: str) -> str:
+    if name not in ENGINES:
+        raise ValueError(f"unknown classifier engine {name!r}; expected one of {', '.join(ENGINES)}")
+    return name
+
+# engine classify_batch uses: "rules" (first-match keyword chains) or "vector" (needs numpy)
+CLASSIFIER_ENGINE = _engine(os.environ.get("NEWS_CLASSIFIER", "rules"))
+
+class KeywordRule(NamedTuple):
+    """Maps a title to `value` when it contains any of `keywords` (and any of `requires`, if given)"""
+    keywords: Tuple[str, ...]
+    value: str
+    requires: Tuple[str, ...] = ()
+
+class Classification(NamedTuple):
+    category: str
+    image_url: str
+    topic: str
+
+# Rules are evaluated in order and the first match wins, so more specific rules come first.
+IMAGE_RULES = [
+    KeywordRule(('ゴシップ', '口論', '騒動', '疑惑', '小競り合い', '問題', '合コン', '不倫', 'スキャンダル'), "https://images.unsplash.com/photo-1573496359142-b8d87734a5a2?w=400&h=300&fit=crop", requires=('m谷',)),  # 議論・問題
+    KeywordRule(('表彰', '振興', '地域', '活動', '貢献', '成果', '新薬', '開発', 'プロジェクト', 'エキスパート'), "https://images.unsplash.com/photo-1559027615-cd4628902d4a?w=400&h=300&fit=crop", requires=('m谷',)),  # 表彰・成功
+    KeywordRule(('プロレス', '観戦', 'スポーツ', 'イベント', 'ハンドボール'), "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=300&fit=crop", requires=('m谷',)),  # スポーツ
+    KeywordRule(('m谷',), "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=300&fit=crop"),  # ビジネスマン
+    KeywordRule(('中国', '日本産', '水産物', 'マグロ', 'ホタテ', '輸入', '許可', '449種類'), "https://images.unsplash.com/photo-1544551763-46a013bb70d5?w=400&h=300&fit=crop"),  # 魚・水産物
+    KeywordRule(('広島', '湯崎', 'カザフスタン', '核実験場', '跡地', '訪問', '平和', '核'), "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=400&h=300&fit=crop"),  # 平和記念・核関連
+    KeywordRule(('タイ', '僧侶', '性的関係', '金銭', '脅し', '社会衝撃', '宗教', '寺院'), "https://images.unsplash.com/photo-1563789031959-4c02bcb41319?w=400&h=300&fit=crop"),  # 寺院・宗教
+    KeywordRule(('プロ野球', '日本ハム', '西武', '連勝', '首位', 'パ・リーグ', '野球'), "https://images.unsplash.com/photo-1566577739112-5180d4bf9390?w=400&h=300&fit=crop"),  # 野球
+    KeywordRule(('横綱', '大の里', '相撲', '名古屋場所', '1敗', '力士'), "https://images.unsplash.com/photo-1544947950-fa07a98d237f?w=400&h=300&fit=crop"),  # 相撲
+    KeywordRule(('スポーツ', '試合', '選手', '競技', '勝利', '敗北', '大会', 'オリンピック'), "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?w=400&h=300&fit=crop"),  # スポーツ一般
+    KeywordRule(('外交', '国際', '大使', '首脳', '会談', '条約', '貿易摩擦'), "https://images.unsplash.com/photo-1521791136064-7986c2920216?w=400&h=300&fit=crop"),  # 外交
+    KeywordRule(('政治', '政府', '首相', '大臣', '国会', '選挙', '政策', '法案', '議員'), "https://images.unsplash.com/photo-1529107386315-e1a2ed48a620?w=400&h=300&fit=crop"),  # 政治
+    KeywordRule(('事件', '事故', '犯罪', '逮捕', '裁判', '判決', '社会', '衝撃'), "https://images.unsplash.com/photo-1589829545856-d10d557cf95f?w=400&h=300&fit=crop"),  # 社会問題
+    KeywordRule(('地震', '震災', '災害', '台風', '津波', '火災'), "https://images.unsplash.com/photo-1547036967-23d11aacaee0?w=400&h=300&fit=crop"),  # 災害
+    KeywordRule(('科学', '研究', '実験', '発見', '宇宙', '技術'), "https://images.unsplash.com/photo-1532094349884-543bc11b234d?w=400&h=300&fit=crop"),  # 科学研究
+    KeywordRule(('環境', '気候', '温暖化', 'co2', '排出', '自然', '生態'), "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?w=400&h=300&fit=crop"),  # 環境
+    KeywordRule(('ai', '人工知能', 'it', 'テクノロジー', 'デジタル', 'ソフトウェア', 'アプリ'), "https://images.unsplash.com/photo-1518709268805-4e9042af2176?w=400&h=300&fit=crop"),  # テクノロジー
+    KeywordRule(('医療', '病院', '薬', '治療', '患者', '医師', '健康', 'ワクチン'), "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?w=400&h=300&fit=crop"),  # 医療
+    KeywordRule(('教育', '学校', '大学', '学生', '授業', '研究', '入試', '受験'), "https://images.unsplash.com/photo-1523050854058-8df90110c9f1?w=400&h=300&fit=crop"),  # 教育
+    KeywordRule(('交通', '電車', '新幹線', '航空', '道路', 'バス', '運輸', '鉄道'), "https://images.unsplash.com/photo-1544620347-c4fd4a3d5957?w=400&h=300&fit=crop"),  # 交通
+    KeywordRule(('自動車', '車', 'トヨタ', 'ホンダ', '日産', 'ev', '電気自動車'), "https://images.unsplash.com/photo-1549924231-f129b911e442?w=400&h=300&fit=crop"),  # 自動車
+    KeywordRule(('株価', '株式', '投資', '市場', '日経', 'ダウ', '証券', '金融', '銀行'), "https://images.unsplash.com/photo-1611974789855-9c2a0a7236a3?w=400&h=300&fit=crop"),  # 金融
+    KeywordRule(('企業', '会社', 'ビジネス', '業績', '決算', '売上', '経営', 'cro'), "https://images.unsplash.com/photo-1486406146926-c627a92ad1ab?w=400&h=300&fit=crop"),  # ビジネス
+    KeywordRule(('不動産', '住宅', '建設', '建物', 'マンション', '土地'), "https://images.unsplash.com/photo-1560518883-ce09059eeffa?w=400&h=300&fit=crop"),  # 不動産
+    KeywordRule(('小売', '店舗', '販売', '消費', 'コンビニ', '売上'), "https://images.unsplash.com/photo-1556742049-0cfed4f6a45d?w=400&h=300&fit=crop"),  # 小売
+    KeywordRule(('エネルギー', '電力', '石油', 'ガス', '原油', '発電', '再生可能'), "https://images.unsplash.com/photo-1473341304170-971dccb5ac1e?w=400&h=300&fit=crop"),  # エネルギー
+    KeywordRule(('製造', '工場', '生産', '産業', '機械', '輸出', '輸入'), "https://images.unsplash.com/photo-1581091226825-a6a2a5aee158?w=400&h=300&fit=crop"),  # 製造業
+    KeywordRule(('食品', '農業', '農産物', '食料', '料理', '飲食'), "https://images.unsplash.com/photo-1542838132-92c53300491e?w=400&h=300&fit=crop"),  # 食品・農業
+    KeywordRule(('旅行', '観光', 'ホテル', '空港', 'ana', 'jal'), "https://images.unsplash.com/photo-1436491865332-7a61a109cc05?w=400&h=300&fit=crop"),  # 旅行
+    KeywordRule(('映画', '音楽', '芸能', 'テレビ', 'ドラマ', 'アニメ', '文化', 'アート'), "https://images.unsplash.com/photo-1489824904134-891ab64532f1?w=400&h=300&fit=crop"),  # エンターテイメント
+]
+DEFAULT_IMAGE_URL = "https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=400&h=300&fit=crop"  # 一般ニュース
+
+CATEGORY_RULES = [
+    KeywordRule(('野球', 'サッカー', 'テニス', 'ゴルフ', '相撲', 'スポーツ', '横綱', '選手', '試合', '勝利', '敗北', 'プロ野球', 'jリーグ', 'オリンピック', '大会', '競技'), "スポーツ"),
+    KeywordRule(('政治', '政府', '首相', '大臣', '国会', '選挙', '政策', '法案', '議員', '党', '内閣', '官房'), "政治"),
+    KeywordRule(('中国', '韓国', 'アメリカ', 'ロシア', '北朝鮮', '台湾', '外交', '国際', '大使', '首脳', '会談', '条約', '貿易摩擦'), "国際"),
+    KeywordRule(('ai', '人工知能', 'it', 'テクノロジー', 'デジタル', 'ソフトウェア', 'アプリ', 'システム', 'ネット', 'インターネット', 'スマホ', 'コンピュータ'), "テクノロジー"),
+    KeywordRule(('社会', '事件', '事故', '災害', '地震', '台風', '火災', '犯罪', '逮捕', '裁判', '判決', '宗教', '僧侶', '寺院'), "社会"),
+    KeywordRule(('医療', '病院', '薬', '治療', '患者', '医師', '看護', '健康', 'ワクチン', '感染', 'コロナ', '新型', 'インフルエンザ'), "医療"),
+    KeywordRule(('環境', '気候', '温暖化', '科学', '研究', '実験', '発見', '宇宙', '原発', '核', '平和', '原爆'), "科学・環境"),
+    KeywordRule(('芸能', '映画', '音楽', 'テレビ', 'ドラマ', 'アニメ', '俳優', '歌手', 'タレント', 'アイドル', 'コンサート'), "エンタメ"),
+    KeywordRule(('交通', '電車', '新幹線', '航空', '空港', '道路', '自動車', 'バス', '運輸', '鉄道'), "交通"),
+    KeywordRule(('教育', '学校', '大学', '学生', '入試', '受験', '授業', '教師', '先生', '学習'), "教育"),
+]
+DEFAULT_CATEGORY = "経済"
+
+TOPIC_RULES = [
+    KeywordRule(('セブン', 'コンビニ', '小売'), "小売業界"),
+    KeywordRule(('マンション', '不動産'), "不動産市場"),
+    KeywordRule(('株価', '投資'), "株式市場"),
+    KeywordRule(('企業', '業績'), "企業業績"),
+    KeywordRule(('中国', '輸入', '水産物', '貿易'), "国際貿易"),
+    KeywordRule(('広島', '核', '平和'), "平和・核問題"),
+    KeywordRule(('相撲', 'スポーツ', '横綱'), "スポーツ"),
+    KeywordRule(('宗教', '僧侶', '社会'), "社会問題"),
+]
+DEFAULT_TOPIC = "経済動向"
+
+def _trie_regex(keywords) -> str:
+    """Build a prefix-factored alternation that prefers the longest keyword at each position"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        alternation = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{alternation})?"
+        return alternation
+
+    return render(trie)
+
+class KeywordMatcher:
+    """Evaluates several first-match rule tables against a title with a single regex scan.
+
+    All keywords are compiled into one prefix-factored alternation that prefers the
+    longest keyword at each position. Keywords hidden inside or overlapping a match are
+    recovered from precomputed tables, so the set of found keywords is identical to
+    running `keyword in title` for every keyword.
+    """
+
+    def __init__(self, tables: Sequence[Tuple[Sequence[KeywordRule], str]]):
+        self._tables = [(list(rules), default) for rules, default in tables]
+        self.keywords = keywords = frozenset(
+            keyword
+            for rules, _ in self._tables
+            for rule in rules
+            for keyword in rule.keywords + rule.requires
+        )
+        self._pattern = re.compile(_trie_regex(keywords))
+        # keywords found whenever `keyword` matches, because they are substrings of it
+        self._contained: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+        # keywords that may start inside a match of `keyword` and run past its end,
+        # which a non-overlapping scan would skip
+        self._overlapping: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(
+                other for other in keywords
+                if other not in keyword and any(keyword.endswith(other[:i]) for i in range(1, len(other)))
+            )
+            for keyword in keywords
+        }
+        # keyword -> indices of the rules it can trigger, per table
+        self._triggers: List[Dict[str, Tuple[int, ...]]] = []
+        for rules, _ in self._tables:
+            triggers: Dict[str, List[int]] = {}
+            for index, rule in enumerate(rules):
+                for keyword in rule.keywords:
+                    triggers.setdefault(keyword, []).append(index)
+            self._triggers.append({keyword: tuple(indices) for keyword, indices in triggers.items()})
+        self._resolve = lru_cache(maxsize=4096)(self._resolve_uncached)
+
+    def find_keywords(self, text: str) -> FrozenSet[str]:
+        found = set()
+        for keyword in self._pattern.findall(text):
+            found |= self._contained[keyword]
+            for other in self._overlapping[keyword]:
+                if other in text:
+                    found.add(other)
+        return frozenset(found)
+
+    def match(self, text: str) -> Tuple[str, ...]:
+        """Return the first matching rule value (or the default) for every table"""
+        return self._resolve(self.find_keywords(text))
+
+    def resolve(self, found: FrozenSet[str]) -> Tuple[str, ...]:
+        """Like match, for a text in which the keywords `found` (and no others) occur"""
+        return self._resolve(found)
+
+    def _resolve_uncached(self, found: FrozenSet[str]) -> Tuple[str, ...]:
+        results = []
+        for (rules, default), triggers in zip(self._tables, self._triggers):
+            candidates = sorted({index for keyword in found for index in triggers.get(keyword, ())})
+            for index in candidates:
+                requires = rules[index].requires
+                if not requires or not found.isdisjoint(requires):
+                    results.append(rules[index].value)
+                    break
+            else:
+                results.append(default)
+        return tuple(results)
+
+_matcher = KeywordMatcher([
+    (CATEGORY_RULES, DEFAULT_CATEGORY),
+    (IMAGE_RULES, DEFAULT_IMAGE_URL),
+    (TOPIC_RULES, DEFAULT_TOPIC),
+])
+
+def classify_title(title: str) -> Classification:
+    """Determine category, related image and summary topic of a news title in one pass"""
+    return Classification(*_matcher.match(title.lower()))
+
+def classify_batch(titles: Sequence[str], engine: Optional[str] = None) -> List[Classification]:
+    """Classify many titles in one call with `engine` (NEWS_CLASSIFIER, "rules" by default)"""
+    engine = _engine(engine or CLASSIFIER_ENGINE)
+    if engine == "vector":
+        classifier = _vector_classifier()
+        if classifier is not None:
+            return classifier.classify(titles)
+    return [classify_title(title) for title in titles]
+
+@lru_cache(maxsize=None)
+def _vector_classifier():
+    try:
+        from app.vector_classify import VectorClassifier  # numpy is optional
+    except ImportError:
+        logger.warning("The vector classifier needs numpy; falling back to the rule engine")
+        return None
+    return VectorClassifier(CATEGORY_RULES, DEFAULT_CATEGORY, _matcher)
+
+def get_news_related_image(title: str) -> str:
+    """Get a relevant illustration/image URL based on news title with enhanced keyword matching"""
+    return classify_title(title).image_url
+
+def get_news_category(title: str) -> str:
+    """Determine news category based on title content"""
+    return classify_title(title).category
+
+def get_news_topic(title: str) -> str:
+    """Determine the topic label used in the overall summary"""
+    return classify_title(title).topic
@@ -0,0 +1,97 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from app.models import NewsItem
+from app.normalize import normalize_text
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+MAX_DISTANCE = 3  # fingerprints at most this many bits apart are the same story
+BANDS = MAX_DISTANCE + 1  # pigeonhole: two fingerprints within MAX_DISTANCE agree on at least one band
+BAND_BITS = FINGERPRINT_BITS // BANDS
+
+# Per-bit vote counts are summed in parallel as LANE_BITS-wide lanes of one big
+# integer, so a shingle costs one addition instead of FINGERPRINT_BITS.
+_LANE_BITS = 16
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_SPREAD_BYTE = [
+    sum(1 << (bit * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+
+@lru_cache(maxsize=65536)
+def _shingle_votes(shingle: str) -> int:
+    """The shingle's 64-bit hash with every bit moved into its own lane"""
+    digest = hashlib.blake2b(shingle.encode(), digest_size=FINGERPRINT_BITS // 8).digest()
+    votes = 0
+    for position, byte in enumerate(digest):
+        votes |= _SPREAD_BYTE[byte] << (position * 8 * _LANE_BITS)
+    return votes
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over the character shingles of `text`; similar texts get nearby fingerprints"""
+    text = "".join(normalize_text(text).split())
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+    votes = sum(map(_shingle_votes, shingles))
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if 2 * ((votes >> (bit * _LANE_BITS)) & _LANE_MASK) > len(shingles):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+@lru_cache(maxsize=4096)
+def _text_fingerprint(title: str, summary: str) -> int:
+    return simhash(f"{title}\n{summary}")
+
+def fingerprint(item: NewsItem) -> int:
+    return _text_fingerprint(item.title, item.summary)
+
+def _band_keys(fingerprint: int) -> Iterator[Tuple[int, int]]:
+    mask = (1 << BAND_BITS) - 1
+    for band in range(BANDS):
+        yield band, (fingerprint >> (band * BAND_BITS)) & mask
+
+def cluster_stories(items: Sequence[NewsItem]) -> List[Tuple[NewsItem, ...]]:
+    """Group articles that tell the same story, across every source.
+
+    Articles sharing a URL, or whose title-and-summary fingerprints differ in at
+    most MAX_DISTANCE bits, join the same cluster. Candidates come from LSH
+    buckets keyed by each BAND_BITS-wide band of the fingerprint, so an article is
+    only compared with the few that share a band rather than with every other.
+    Clusters and their members keep input order; the first member represents the
+    cluster.
+    """
+    clusters: List[List[NewsItem]] = []
+    fingerprints: List[int] = []  # per cluster, its representative's
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    by_url: Dict[str, int] = {}
+
+    for item in items:
+        item_fingerprint = fingerprint(item)
+        keys = list(_band_keys(item_fingerprint))
+        cluster = by_url.get(item.url)
+        if cluster is None:
+            cluster = next(
+                (
+                    candidate
+                    for key in keys
+                    for candidate in buckets.get(key, ())
+                    if (item_fingerprint ^ fingerprints[candidate]).bit_count() <= MAX_DISTANCE
+                ),
+                None,
+            )
+        if cluster is None:
+            cluster = len(clusters)
+            clusters.append([])
+            fingerprints.append(item_fingerprint)
+            for key in keys:
+                buckets.setdefault(key, []).append(cluster)
+        clusters[cluster].append(item)
+        if item.url:
+            by_url.setdefault(item.url, cluster)
+    return [tuple(members) for members in clusters]
+
+def representatives(items: Sequence[NewsItem]) -> List[NewsItem]:
+    """One article per story, in input order"""
+    return [members[0] for members in cluster_stories(items)]
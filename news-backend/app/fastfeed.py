@@ -0,0 +1,133 @@
+import re
+from typing import Callable, List, Optional, Tuple
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+from feedparser import FeedParserDict
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+
+CHUNK_SIZE = 16 * 1024
+
+# feedparser's sanitizer drops these elements together with their text, so
+# summaries containing them are left to feedparser
+_DROPPED_ELEMENTS_RE = re.compile(r"<\s*(script|style|applet)\b", re.IGNORECASE)
+
+class Unsupported(Exception):
+    """The document needs feedparser: not RSS 2.0/Atom, or uses a construct the fast path does not mirror"""
+
+def parse_entries(content: bytes, limit: int) -> Optional[List[FeedParserDict]]:
+    """Parse the first `limit` entries of a well-formed RSS 2.0 or Atom document.
+
+    Entries carry the same keys and values feedparser would give build_news_item
+    and entry_cache_key (title, link, id, published, summary), and parsing stops
+    as soon as `limit` entries have been read. Returns None when the document is
+    malformed, has no entries or is anything the fast path does not handle;
+    the caller then falls back to feedparser.
+    """
+    if limit <= 0:
+        return None
+    parser = XMLPullParser(events=("start", "end"))
+    entries: List[FeedParserDict] = []
+    entry_tag, entry_depth, read_entry = None, 0, None
+    depth = 0
+    try:
+        for offset in range(0, len(content), CHUNK_SIZE):
+            parser.feed(content[offset:offset + CHUNK_SIZE])
+            for event, element in parser.read_events():
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        entry_tag, entry_depth, read_entry = _layout(element)
+                    continue
+                if depth == entry_depth and element.tag == entry_tag:
+                    entries.append(read_entry(element))
+                    element.clear()
+                    if len(entries) >= limit:
+                        return entries
+                depth -= 1
+        parser.close()
+    except (ParseError, Unsupported):
+        return None
+    except ValueError:
+        # expat cannot decode multi-byte encodings other than UTF-8/16 (Shift_JIS, EUC-JP)
+        return None
+    return entries or None
+
+def _layout(root: Element) -> Tuple[str, int, Callable[[Element], FeedParserDict]]:
+    """Entry element, its depth and its reader for the document type given by `root`"""
+    if root.tag == "rss" and root.get("version", "").startswith("2."):
+        return "item", 3, _rss_item  # <rss><channel><item>
+    if root.tag == f"{ATOM}feed":
+        return f"{ATOM}entry", 2, _atom_entry  # <feed><entry>
+    raise Unsupported(root.tag)
+
+def _only(element: Element, tag: str) -> Optional[Element]:
+    found = element.findall(tag)
+    if len(found) > 1:
+        raise Unsupported(f"repeated {tag}")
+    return found[0] if found else None
+
+def _text(element: Optional[Element]) -> Optional[str]:
+    if element is None:
+        return None
+    if len(element):
+        raise Unsupported(f"markup inside {element.tag}")
+    return (element.text or "").strip()
+
+def _link(url: Optional[str]) -> str:
+    # feedparser resolves relative links against the document's base; leave those to it
+    if not url or not url.startswith(("http://", "https://")):
+        raise Unsupported("missing or relative link")
+    return url
+
+def _summary(summary: Optional[str]) -> Optional[str]:
+    if summary is not None and _DROPPED_ELEMENTS_RE.search(summary):
+        raise Unsupported("summary needs sanitizing")
+    return summary
+
+def _entry(title: Optional[str], link: str, entry_id: Optional[str], published: Optional[str], summary: Optional[str]) -> FeedParserDict:
+    if title is None:
+        raise Unsupported("entry without title")
+    entry = FeedParserDict(title=title, link=link)
+    if entry_id:
+        entry["id"] = entry_id
+    if published:
+        entry["published"] = published
+    if summary is not None:
+        entry["summary"] = summary
+    return entry
+
+def _rss_item(item: Element) -> FeedParserDict:
+    summary = _text(_only(item, "description"))
+    if summary is None:
+        # feedparser falls back to the full content for the summary
+        summary = _text(_only(item, CONTENT_ENCODED))
+    return _entry(
+        title=_text(_only(item, "title")),
+        link=_link(_text(_only(item, "link"))),
+        entry_id=_text(_only(item, "guid")),
+        published=_text(_only(item, "pubDate")),
+        summary=_summary(summary),
+    )
+
+def _atom_text(element: Optional[Element], allow_html: bool) -> Optional[str]:
+    if element is None:
+        return None
+    kind = element.get("type", "text")
+    if kind not in ("text", "html") or (kind == "html" and not allow_html):
+        raise Unsupported(f"{kind} text construct in {element.tag}")
+    return _text(element)
+
+def _atom_entry(entry: Element) -> FeedParserDict:
+    links = [link for link in entry.findall(f"{ATOM}link") if link.get("rel", "alternate") == "alternate"]
+    summary = _atom_text(_only(entry, f"{ATOM}summary"), allow_html=True)
+    if summary is None:
+        summary = _atom_text(_only(entry, f"{ATOM}content"), allow_html=True)
+    return _entry(
+        title=_atom_text(_only(entry, f"{ATOM}title"), allow_html=False),
+        link=_link(links[0].get("href") if links else None),
+        entry_id=_text(_only(entry, f"{ATOM}id")),
+        published=_text(_only(entry, f"{ATOM}published")),
+        summary=_summary(summary),
+    )
@@ -0,0 +1,140 @@
+import asyncio
+import feedparser
+import hashlib
+import httpx
+import time
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from app.cache import TTLCache
+from app.classify import Classification, classify_batch, classify_title
+from app.fastfeed import parse_entries
+from app.metrics import ENTRIES_INGESTED, ENTRY_CLASSIFY_SECONDS, ENTRY_NORMALIZE_SECONDS, FEED_FETCH_SECONDS, FEED_PARSE_FALLBACKS, FEED_PARSE_SECONDS
+from app.models import NewsItem
+from app.normalize import normalize_summary
+
+class FeedSource(NamedTuple):
+    url: str
+    source: str
+    max_entries: int
+    refresh_interval: float  # seconds between polls of this feed
+    short_summary: str  # fallback used when the feed summary is too short
+    timeout: float = 10.0  # deadline in seconds for downloading and parsing this feed
+    max_staleness: float = 3600.0  # seconds the last good entries are served while the feed keeps failing
+    parser: str = "feedparser"  # "fast" tries app.fastfeed first and falls back to feedparser
+
+class FeedState(NamedTuple):
+    """Last successfully parsed entries of a feed plus the validators needed for a conditional GET"""
+    items: Tuple[NewsItem, ...] = ()
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0  # time.time() of the last successful fetch, 304s included
+
+def build_news_item(entry, feed_source: FeedSource, classification: Optional[Classification] = None) -> NewsItem:
+    """Normalize and classify a single feed entry into a NewsItem (or use its precomputed `classification`)"""
+    title = entry.title
+    with ENTRY_NORMALIZE_SECONDS.time():
+        summary = normalize_summary(entry.get('summary', entry.get('description', '')), title, feed_source.short_summary)
+
+    if classification is None:
+        with ENTRY_CLASSIFY_SECONDS.time():
+            classification = classify_title(title)
+
+    return NewsItem(
+        title=title,
+        summary=summary,
+        published=entry.get('published', datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        source=feed_source.source,
+        url=entry.get('link', ''),
+        image_url=classification.image_url,
+        category=classification.category
+    )
+
+def build_news_items(entries: Sequence, feed_source: FeedSource) -> List[NewsItem]:
+    """Build NewsItems for several entries, classifying all their titles in one classify_batch call"""
+    if not entries:
+        return []
+    start = time.perf_counter()
+    classifications = classify_batch([entry.title for entry in entries])
+    per_entry = (time.perf_counter() - start) / len(entries)
+    for _ in entries:
+        ENTRY_CLASSIFY_SECONDS.observe(per_entry)
+    return [build_news_item(entry, feed_source, classification) for entry, classification in zip(entries, classifications)]
+
+def entry_cache_key(entry, feed_source: FeedSource) -> Tuple[str, str, str]:
+    """Identify an entry by its GUID (or link) plus a hash of the fields NewsItem is built from"""
+    digest = hashlib.blake2b(digest_size=8)
+    for field in ('title', 'summary', 'description', 'published', 'link'):
+        digest.update(entry.get(field, '').encode())
+        digest.update(b'\0')
+    return feed_source.source, entry.get('id') or entry.get('link', ''), digest.hexdigest()
+
+def create_entry_cache() -> TTLCache[NewsItem]:
+    """Cache of already-built NewsItems so unchanged entries skip normalization and classification"""
+    return TTLCache(maxsize=2048, ttl=6 * 60 * 60)
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by all feed fetches"""
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        headers={"User-Agent": "news-backend/0.1"},
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+
+def parse_feed(content: bytes, feed_source: FeedSource, entry_cache: Optional[TTLCache[NewsItem]] = None) -> List[NewsItem]:
+    """Parse a downloaded feed document and return its newest entries as NewsItems"""
+    with FEED_PARSE_SECONDS.time(feed=feed_source.url):
+        entries = None
+        if feed_source.parser == "fast":
+            entries = parse_entries(content, feed_source.max_entries)
+            if entries is None:
+                FEED_PARSE_FALLBACKS.inc(feed=feed_source.url)
+        if entries is None:
+            feed = feedparser.parse(content)
+            if feed.bozo and not feed.entries:
+                raise feed.bozo_exception
+            entries = feed.entries[:feed_source.max_entries]
+
+    if entry_cache is None:
+        items = build_news_items(entries, feed_source)
+    else:
+        keys = [entry_cache_key(entry, feed_source) for entry in entries]
+        items = [entry_cache.get(key) for key in keys]
+        # only entries that are new or changed are built, as one batch
+        missing = [index for index, news_item in enumerate(items) if news_item is None]
+        for index, news_item in zip(missing, build_news_items([entries[index] for index in missing], feed_source)):
+            entry_cache.put(keys[index], news_item)
+            items[index] = news_item
+    ENTRIES_INGESTED.inc(len(items), feed=feed_source.url)
+    return items
+
+async def fetch_feed(
+    client: httpx.AsyncClient,
+    feed_source: FeedSource,
+    previous: FeedState = FeedState(),
+    entry_cache: Optional[TTLCache[NewsItem]] = None,
+) -> FeedState:
+    """Download a single feed over the shared client and parse it off the event loop.
+
+    The previous ETag/Last-Modified values are sent back so an unchanged feed answers
+    304 Not Modified, in which case `previous` is returned as-is without re-parsing.
+    """
+    headers = {}
+    if previous.etag:
+        headers["If-None-Match"] = previous.etag
+    if previous.last_modified:
+        headers["If-Modified-Since"] = previous.last_modified
+
+    with FEED_FETCH_SECONDS.time(feed=feed_source.url):
+        async with asyncio.timeout(feed_source.timeout):
+            response = await client.get(feed_source.url, headers=headers, timeout=feed_source.timeout)
+            if response.status_code == 304:
+                return previous
+            response.raise_for_status()
+            items = await asyncio.to_thread(parse_feed, response.content, feed_source, entry_cache)
+
+    return FeedState(
+        items=tuple(items),
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
@@ -0,0 +1,65 @@
+import hashlib
+from typing import Callable, Hashable, Optional, Tuple
+
+from fastapi import Response
+
+from app.cache import TTLCache
+from app.snapshot import NewsSnapshot
+
+CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=300"
+
+class CachedBody:
+    """A pre-serialized JSON response body and its entity tag"""
+
+    __slots__ = ("etag", "body")
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+
+def make_etag(snapshot: NewsSnapshot, *parts: Hashable) -> str:
+    """Strong ETag for a response derived only from the snapshot and the request `parts`.
+
+    The snapshot's publish time is hashed in as well, because versions restart
+    from zero whenever the process does.
+    """
+    digest = hashlib.blake2b(repr((snapshot.refreshed_at.timestamp(),) + parts).encode(), digest_size=6).hexdigest()
+    return f'"{snapshot.version}-{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+class ResponseCache:
+    """Serialized /api/news bodies, keyed by snapshot and request parameters.
+
+    Old versions are never read again and simply age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self._bodies: TTLCache[CachedBody] = TTLCache(maxsize=maxsize, ttl=24 * 60 * 60)
+
+    @property
+    def hits(self) -> int:
+        return self._bodies.hits
+
+    @property
+    def misses(self) -> int:
+        return self._bodies.misses
+
+    def get_or_build(self, snapshot: NewsSnapshot, key: Tuple[Hashable, ...], build: Callable[[], bytes]) -> CachedBody:
+        cache_key = (snapshot.version, snapshot.refreshed_at) + key
+        cached = self._bodies.get(cache_key)
+        if cached is None:
+            cached = CachedBody(make_etag(snapshot, *key), build())
+            self._bodies.put(cache_key, cached)
+        return cached
+
+def cached_response(cached: CachedBody, if_none_match: Optional[str]) -> Response:
+    """200 with the cached body, or 304 when the client already holds this entity"""
+    headers = {"ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
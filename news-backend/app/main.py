@@ -1,13 +1,89 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import feedparser
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 import random
-from typing import List, Dict
-from pydantic import BaseModel
+from typing import Callable, List, Optional
 
-app = FastAPI()
+from app.broadcast import NewsBroadcaster
+from app.classify import get_news_related_image, get_news_topic
+from app.dedup import representatives
+from app.http_cache import ResponseCache, cached_response, etag_matches, make_etag
+from app.logs import configure_logging, request_id
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_REQUEST_SECONDS, REGISTRY, RESPONSE_SERIALIZE_SECONDS, register_cache
+from app.models import NewsHistoryResponse, NewsItem, NewsResponse, SearchResponse
+from app.refresher import FeedRefresher
+from app.search import NgramIndex
+from app.shared import SharedSnapshot
+from app.snapshot import NewsSnapshot
+from app.sources import SourceRegistry
+from app.store import open_store
+
+DEFAULT_PAGE_SIZE = 20
+TOP_VARIANTS = 16
+STREAM_HEARTBEAT_SECONDS = 15
+SEARCH_INDEX_PATH = os.environ.get("NEWS_SEARCH_INDEX_PATH")
+SEARCH_INDEX_SAVE_INTERVAL = 300
+SHARED_SNAPSHOT_DIR = os.environ.get("NEWS_SHARED_SNAPSHOT_DIR")
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+def load_search_index() -> NgramIndex:
+    if SEARCH_INDEX_PATH and os.path.exists(SEARCH_INDEX_PATH):
+        try:
+            return NgramIndex.load(SEARCH_INDEX_PATH)
+        except Exception:
+            logger.exception("Error loading search index", extra={"path": SEARCH_INDEX_PATH})
+    return NgramIndex()
+
+response_cache = ResponseCache()
+register_cache("responses", response_cache)
+
+sources = SourceRegistry.load()
+store = open_store()
+refresher = FeedRefresher(sources.feeds, store)
+# with several workers, one elected worker refreshes and the others follow its snapshots
+snapshots = SharedSnapshot(SHARED_SNAPSHOT_DIR, refresher) if SHARED_SNAPSHOT_DIR else refresher
+broadcaster = NewsBroadcaster()
+snapshots.add_listener(broadcaster.on_snapshot)
+search_index = load_search_index()
+snapshots.add_listener(search_index.on_snapshot)
+
+def saves_search_index() -> bool:
+    """Whether this worker persists the search index; with a shared snapshot only the leader does"""
+    return bool(SEARCH_INDEX_PATH) and (not isinstance(snapshots, SharedSnapshot) or snapshots.is_leader)
+
+async def save_search_index_periodically() -> None:
+    while True:
+        await asyncio.sleep(SEARCH_INDEX_SAVE_INTERVAL)
+        if search_index.dirty and saves_search_index():
+            try:
+                await asyncio.to_thread(search_index.save, SEARCH_INDEX_PATH)
+            except Exception:
+                logger.exception("Error saving search index", extra={"path": SEARCH_INDEX_PATH})
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await snapshots.start()
+    autosave = asyncio.create_task(save_search_index_periodically()) if SEARCH_INDEX_PATH else None
+    yield
+    if autosave is not None:
+        autosave.cancel()
+    save_search_index = saves_search_index()  # decided before stop() gives up the leadership
+    await snapshots.stop()
+    if save_search_index and search_index.dirty:
+        await asyncio.to_thread(search_index.save, SEARCH_INDEX_PATH)
+    if store is not None:
+        store.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -18,157 +94,34 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-class NewsItem(BaseModel):
-    title: str
-    summary: str
-    published: str
-    source: str
-    url: str
-    image_url: str
-    category: str = "経済"
-
-class NewsResponse(BaseModel):
-    success: bool
-    data: List[NewsItem]
-    count: int
-    generated_at: str
-    overall_summary: str
-
-def get_news_related_image(title: str) -> str:
-    """Get a relevant illustration/image URL based on news title with enhanced keyword matching"""
-    title_lower = title.lower()
-    
-    if any(keyword in title_lower for keyword in ['m谷']):
-        if any(keyword in title_lower for keyword in ['ゴシップ', '口論', '騒動', '疑惑', '小競り合い', '問題', '合コン', '不倫', 'スキャンダル']):
-            return "https://images.unsplash.com/photo-1573496359142-b8d87734a5a2?w=400&h=300&fit=crop"  # 議論・問題
-        elif any(keyword in title_lower for keyword in ['表彰', '振興', '地域', '活動', '貢献', '成果', '新薬', '開発', 'プロジェクト', 'エキスパート']):
-            return "https://images.unsplash.com/photo-1559027615-cd4628902d4a?w=400&h=300&fit=crop"  # 表彰・成功
-        elif any(keyword in title_lower for keyword in ['プロレス', '観戦', 'スポーツ', 'イベント', 'ハンドボール']):
-            return "https://images.unsplash.com/photo-1571019613454-1cb2f99b2d8b?w=400&h=300&fit=crop"  # スポーツ
-        else:
-            return "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=300&fit=crop"  # ビジネスマン
-    
-    elif any(keyword in title_lower for keyword in ['中国', '日本産', '水産物', 'マグロ', 'ホタテ', '輸入', '許可', '449種類']):
-        return "https://images.unsplash.com/photo-1544551763-46a013bb70d5?w=400&h=300&fit=crop"  # 魚・水産物
-    
-    elif any(keyword in title_lower for keyword in ['広島', '湯崎', 'カザフスタン', '核実験場', '跡地', '訪問', '平和', '核']):
-        return "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=400&h=300&fit=crop"  # 平和記念・核関連
-    
-    elif any(keyword in title_lower for keyword in ['タイ', '僧侶', '性的関係', '金銭', '脅し', '社会衝撃', '宗教', '寺院']):
-        return "https://images.unsplash.com/photo-1563789031959-4c02bcb41319?w=400&h=300&fit=crop"  # 寺院・宗教
-    
-    elif any(keyword in title_lower for keyword in ['プロ野球', '日本ハム', '西武', '連勝', '首位', 'パ・リーグ', '野球']):
-        return "https://images.unsplash.com/photo-1566577739112-5180d4bf9390?w=400&h=300&fit=crop"  # 野球
-    
-    elif any(keyword in title_lower for keyword in ['横綱', '大の里', '相撲', '名古屋場所', '1敗', '力士']):
-        return "https://images.unsplash.com/photo-1544947950-fa07a98d237f?w=400&h=300&fit=crop"  # 相撲
-    
-    elif any(keyword in title_lower for keyword in ['スポーツ', '試合', '選手', '競技', '勝利', '敗北', '大会', 'オリンピック']):
-        return "https://images.unsplash.com/photo-1461896836934-ffe607ba8211?w=400&h=300&fit=crop"  # スポーツ一般
-    
-    elif any(keyword in title_lower for keyword in ['外交', '国際', '大使', '首脳', '会談', '条約', '貿易摩擦']):
-        return "https://images.unsplash.com/photo-1521791136064-7986c2920216?w=400&h=300&fit=crop"  # 外交
-    
-    elif any(keyword in title_lower for keyword in ['政治', '政府', '首相', '大臣', '国会', '選挙', '政策', '法案', '議員']):
-        return "https://images.unsplash.com/photo-1529107386315-e1a2ed48a620?w=400&h=300&fit=crop"  # 政治
-    
-    elif any(keyword in title_lower for keyword in ['事件', '事故', '犯罪', '逮捕', '裁判', '判決', '社会', '衝撃']):
-        return "https://images.unsplash.com/photo-1589829545856-d10d557cf95f?w=400&h=300&fit=crop"  # 社会問題
-    
-    elif any(keyword in title_lower for keyword in ['地震', '震災', '災害', '台風', '津波', '火災']):
-        return "https://images.unsplash.com/photo-1547036967-23d11aacaee0?w=400&h=300&fit=crop"  # 災害
-    
-    elif any(keyword in title_lower for keyword in ['科学', '研究', '実験', '発見', '宇宙', '技術']):
-        return "https://images.unsplash.com/photo-1532094349884-543bc11b234d?w=400&h=300&fit=crop"  # 科学研究
-    
-    elif any(keyword in title_lower for keyword in ['環境', '気候', '温暖化', 'co2', '排出', '自然', '生態']):
-        return "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?w=400&h=300&fit=crop"  # 環境
-    
-    elif any(keyword in title_lower for keyword in ['ai', '人工知能', 'it', 'テクノロジー', 'デジタル', 'ソフトウェア', 'アプリ']):
-        return "https://images.unsplash.com/photo-1518709268805-4e9042af2176?w=400&h=300&fit=crop"  # テクノロジー
-    
-    elif any(keyword in title_lower for keyword in ['医療', '病院', '薬', '治療', '患者', '医師', '健康', 'ワクチン']):
-        return "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?w=400&h=300&fit=crop"  # 医療
-    
-    elif any(keyword in title_lower for keyword in ['教育', '学校', '大学', '学生', '授業', '研究', '入試', '受験']):
-        return "https://images.unsplash.com/photo-1523050854058-8df90110c9f1?w=400&h=300&fit=crop"  # 教育
-    
-    elif any(keyword in title_lower for keyword in ['交通', '電車', '新幹線', '航空', '道路', 'バス', '運輸', '鉄道']):
-        return "https://images.unsplash.com/photo-1544620347-c4fd4a3d5957?w=400&h=300&fit=crop"  # 交通
-    
-    elif any(keyword in title_lower for keyword in ['自動車', '車', 'トヨタ', 'ホンダ', '日産', 'ev', '電気自動車']):
-        return "https://images.unsplash.com/photo-1549924231-f129b911e442?w=400&h=300&fit=crop"  # 自動車
-    
-    elif any(keyword in title_lower for keyword in ['株価', '株式', '投資', '市場', '日経', 'ダウ', '証券', '金融', '銀行']):
-        return "https://images.unsplash.com/photo-1611974789855-9c2a0a7236a3?w=400&h=300&fit=crop"  # 金融
-    
-    elif any(keyword in title_lower for keyword in ['企業', '会社', 'ビジネス', '業績', '決算', '売上', '経営', 'cro']):
-        return "https://images.unsplash.com/photo-1486406146926-c627a92ad1ab?w=400&h=300&fit=crop"  # ビジネス
-    
-    elif any(keyword in title_lower for keyword in ['不動産', '住宅', '建設', '建物', 'マンション', '土地']):
-        return "https://images.unsplash.com/photo-1560518883-ce09059eeffa?w=400&h=300&fit=crop"  # 不動産
-    
-    elif any(keyword in title_lower for keyword in ['小売', '店舗', '販売', '消費', 'コンビニ', '売上']):
-        return "https://images.unsplash.com/photo-1556742049-0cfed4f6a45d?w=400&h=300&fit=crop"  # 小売
-    
-    elif any(keyword in title_lower for keyword in ['エネルギー', '電力', '石油', 'ガス', '原油', '発電', '再生可能']):
-        return "https://images.unsplash.com/photo-1473341304170-971dccb5ac1e?w=400&h=300&fit=crop"  # エネルギー
-    
-    elif any(keyword in title_lower for keyword in ['製造', '工場', '生産', '産業', '機械', '輸出', '輸入']):
-        return "https://images.unsplash.com/photo-1581091226825-a6a2a5aee158?w=400&h=300&fit=crop"  # 製造業
-    
-    elif any(keyword in title_lower for keyword in ['食品', '農業', '農産物', '食料', '料理', '飲食']):
-        return "https://images.unsplash.com/photo-1542838132-92c53300491e?w=400&h=300&fit=crop"  # 食品・農業
-    
-    elif any(keyword in title_lower for keyword in ['旅行', '観光', 'ホテル', '空港', 'ana', 'jal']):
-        return "https://images.unsplash.com/photo-1436491865332-7a61a109cc05?w=400&h=300&fit=crop"  # 旅行
-    
-    elif any(keyword in title_lower for keyword in ['映画', '音楽', '芸能', 'テレビ', 'ドラマ', 'アニメ', '文化', 'アート']):
-        return "https://images.unsplash.com/photo-1489824904134-891ab64532f1?w=400&h=300&fit=crop"  # エンターテイメント
-    
-    else:
-        return "https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=400&h=300&fit=crop"  # 一般ニュース
-
-def get_news_category(title: str) -> str:
-    """Determine news category based on title content"""
-    title_lower = title.lower()
-    
-    if any(keyword in title_lower for keyword in ['野球', 'サッカー', 'テニス', 'ゴルフ', '相撲', 'スポーツ', '横綱', '選手', '試合', '勝利', '敗北', 'プロ野球', 'jリーグ', 'オリンピック', '大会', '競技']):
-        return "スポーツ"
-    
-    elif any(keyword in title_lower for keyword in ['政治', '政府', '首相', '大臣', '国会', '選挙', '政策', '法案', '議員', '党', '内閣', '官房']):
-        return "政治"
-    
-    elif any(keyword in title_lower for keyword in ['中国', '韓国', 'アメリカ', 'ロシア', '北朝鮮', '台湾', '外交', '国際', '大使', '首脳', '会談', '条約', '貿易摩擦']):
-        return "国際"
-    
-    elif any(keyword in title_lower for keyword in ['ai', '人工知能', 'it', 'テクノロジー', 'デジタル', 'ソフトウェア', 'アプリ', 'システム', 'ネット', 'インターネット', 'スマホ', 'コンピュータ']):
-        return "テクノロジー"
-    
-    elif any(keyword in title_lower for keyword in ['社会', '事件', '事故', '災害', '地震', '台風', '火災', '犯罪', '逮捕', '裁判', '判決', '宗教', '僧侶', '寺院']):
-        return "社会"
-    
-    elif any(keyword in title_lower for keyword in ['医療', '病院', '薬', '治療', '患者', '医師', '看護', '健康', 'ワクチン', '感染', 'コロナ', '新型', 'インフルエンザ']):
-        return "医療"
-    
-    elif any(keyword in title_lower for keyword in ['環境', '気候', '温暖化', '科学', '研究', '実験', '発見', '宇宙', '原発', '核', '平和', '原爆']):
-        return "科学・環境"
-    
-    elif any(keyword in title_lower for keyword in ['芸能', '映画', '音楽', 'テレビ', 'ドラマ', 'アニメ', '俳優', '歌手', 'タレント', 'アイドル', 'コンサート']):
-        return "エンタメ"
-    
-    elif any(keyword in title_lower for keyword in ['交通', '電車', '新幹線', '航空', '空港', '道路', '自動車', 'バス', '運輸', '鉄道']):
-        return "交通"
-    
-    elif any(keyword in title_lower for keyword in ['教育', '学校', '大学', '学生', '入試', '受験', '授業', '教師', '先生', '学習']):
-        return "教育"
-    
-    else:
-        return "経済"
+@app.middleware("http")
+async def track_request(request: Request, call_next):
+    """Tag the request with an id (the client's X-Request-ID, if sent), time it and log it"""
+    rid = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id.set(rid)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(elapsed, route=route, method=request.method, status=str(status_code))
+        logger.info(
+            "%s %s %d",
+            request.method,
+            request.url.path,
+            status_code,
+            extra={"route": route, "status": status_code, "duration_ms": round(elapsed * 1000, 3)},
+        )
+        request_id.reset(token)
+    response.headers["X-Request-ID"] = rid
+    return response
 
-def generate_mizutani_article() -> NewsItem:
-    """Generate a fictional article about M谷"""
-    is_gossip = random.randint(1, 3) == 1
+def generate_mizutani_article(rng: random.Random = random, published: Optional[datetime] = None) -> NewsItem:
+    """Generate a fictional article about M谷, published now unless `published` is given"""
+    is_gossip = rng.randint(1, 3) == 1
     
     if is_gossip:
         gossip_articles = [
@@ -213,7 +166,7 @@ def generate_mizutani_article() -> NewsItem:
                 "summary": "荒川区の町内会で、M谷氏（36歳、CRO勤務）が他の住民と激しい意見対立を起こした。身長183cm、体重95kgの体格で学生時代はハンドボール部に所属していた同氏。既婚者でありながら地域での協調性に欠ける行動が批判されている。プロレス好きの同氏が会議中に大声を出し、他の住民を威圧するような態度を取ったとの証言もある。"
             }
         ]
-        selected_article = random.choice(gossip_articles)
+        selected_article = rng.choice(gossip_articles)
         title = selected_article["title"]
         summary = selected_article["summary"]
         category = "ゴシップ"
@@ -256,7 +209,7 @@ def generate_mizutani_article() -> NewsItem:
                 "summary": "医療業界の発展に貢献するM谷氏（36歳、荒川区在住、CRO勤務）の研究論文が学会で高く評価されている。学生時代のハンドボール部で培った集中力と、身長183cm、体重95kgの体格に裏打ちされた精神力で研究に取り組んだ成果。既婚者として患者への思いも研究の原動力となっており、プロレス観戦で息抜きをしながらも真摯に医療の未来に向き合っている。"
             }
         ]
-        selected_article = random.choice(positive_articles)
+        selected_article = rng.choice(positive_articles)
         title = selected_article["title"]
         summary = selected_article["summary"]
         category = "地域ニュース"
@@ -264,126 +217,21 @@ def generate_mizutani_article() -> NewsItem:
     return NewsItem(
         title=title,
         summary=summary,
-        published=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        published=(published or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
         source="地域ニュース",
         url="https://example.com/mizutani-news",
         image_url=get_news_related_image(title),
         category=category
     )
 
-def fetch_rss_news() -> List[NewsItem]:
-    """Fetch news from RSS feeds with NHK news prioritized"""
-    priority_feeds = [
-        "https://www3.nhk.or.jp/rss/news/cat6.xml",
-        "https://www3.nhk.or.jp/rss/news/cat7.xml",
-        "https://www3.nhk.or.jp/rss/news/cat0.xml",  # Main news
-        "https://www3.nhk.or.jp/rss/news/cat1.xml",  # Social news
-    ]
-    
-    secondary_feeds = [
-        "https://asia.nikkei.com/rss/feed/nar",
-    ]
-    
-    all_news_items = []
-    
-    for feed_url in priority_feeds:
-        try:
-            feed = feedparser.parse(feed_url)
-            source = "NHKニュース"
-            
-            available_entries = feed.entries[:8] if len(feed.entries) >= 8 else feed.entries
-            
-            for entry in available_entries:
-                title = entry.title
-                summary = entry.get('summary', entry.get('description', ''))
-                
-                import re
-                summary = re.sub(r'<[^>]+>', '', summary)
-                
-                if len(summary) > 300:
-                    sentences = summary.split('。')
-                    truncated = ""
-                    for sentence in sentences:
-                        if len(truncated + sentence + '。') <= 280:
-                            truncated += sentence + '。'
-                        else:
-                            break
-                    if truncated and len(truncated) > 100:
-                        summary = truncated
-                    else:
-                        summary = summary[:280]
-                elif len(summary) < 50:
-                    summary = f"{title}に関するニュースです。詳細な情報については、元記事をご確認ください。"
-                
-                category = get_news_category(title)
-                
-                news_item = NewsItem(
-                    title=title,
-                    summary=summary,
-                    published=entry.get('published', datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-                    source=source,
-                    url=entry.get('link', ''),
-                    image_url=get_news_related_image(title),
-                    category=category
-                )
-                all_news_items.append(news_item)
-                
-        except Exception as e:
-            print(f"Error fetching from {feed_url}: {e}")
-            continue
-    
-    for feed_url in secondary_feeds:
-        try:
-            feed = feedparser.parse(feed_url)
-            source = "日経ニュース"
-            
-            available_entries = feed.entries[:5] if len(feed.entries) >= 5 else feed.entries
-            
-            for entry in available_entries:
-                title = entry.title
-                summary = entry.get('summary', entry.get('description', ''))
-                
-                import re
-                summary = re.sub(r'<[^>]+>', '', summary)
-                
-                if len(summary) > 300:
-                    sentences = summary.split('。')
-                    truncated = ""
-                    for sentence in sentences:
-                        if len(truncated + sentence + '。') <= 280:
-                            truncated += sentence + '。'
-                        else:
-                            break
-                    if truncated and len(truncated) > 100:
-                        summary = truncated
-                    else:
-                        summary = summary[:280]
-                elif len(summary) < 50:
-                    summary = f"{title}に関するニュースです。"
-                
-                category = get_news_category(title)
-                
-                news_item = NewsItem(
-                    title=title,
-                    summary=summary,
-                    published=entry.get('published', datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-                    source=source,
-                    url=entry.get('link', ''),
-                    image_url=get_news_related_image(title),
-                    category=category
-                )
-                all_news_items.append(news_item)
-                
-        except Exception as e:
-            print(f"Error fetching from {feed_url}: {e}")
-            continue
-    
-    random.shuffle(all_news_items)
-    return all_news_items
-
 def generate_overall_summary(news_items: List[NewsItem]) -> str:
-    """Generate a 500-character overall summary based on actual collected news"""
-    sources = list(set([item.source for item in news_items]))
+    """Generate a 500-character overall summary based on actual collected news.
+
+    Near-duplicate articles count as one story.
+    """
+    news_items = representatives(news_items)
+    # first-seen order: the same items must always give the same summary (and ETag body)
+    sources = list(dict.fromkeys(item.source for item in news_items))
     mizutani_count = len([item for item in news_items if "M谷" in item.title])
     real_news = [item for item in news_items if "M谷" not in item.title]
     
@@ -392,27 +240,10 @@ def generate_overall_summary(news_items: List[NewsItem]) -> str:
     if real_news:
         topics = []
         for item in real_news[:3]:  # Use first 3 real news items
-            if any(keyword in item.title for keyword in ['セブン', 'コンビニ', '小売']):
-                topics.append("小売業界")
-            elif any(keyword in item.title for keyword in ['マンション', '不動産']):
-                topics.append("不動産市場")
-            elif any(keyword in item.title for keyword in ['株価', '投資']):
-                topics.append("株式市場")
-            elif any(keyword in item.title for keyword in ['企業', '業績']):
-                topics.append("企業業績")
-            elif any(keyword in item.title for keyword in ['中国', '輸入', '水産物', '貿易']):
-                topics.append("国際貿易")
-            elif any(keyword in item.title for keyword in ['広島', '核', '平和']):
-                topics.append("平和・核問題")
-            elif any(keyword in item.title for keyword in ['相撲', 'スポーツ', '横綱']):
-                topics.append("スポーツ")
-            elif any(keyword in item.title for keyword in ['宗教', '僧侶', '社会']):
-                topics.append("社会問題")
-            else:
-                topics.append("経済動向")
+            topics.append(get_news_topic(item.title))
         
         if topics:
-            unique_topics = list(set(topics))
+            unique_topics = list(dict.fromkeys(topics))
             summary += f"主要トピックは{', '.join(unique_topics[:2])}などです。"
     
     if mizutani_count > 0:
@@ -425,57 +256,161 @@ def generate_overall_summary(news_items: List[NewsItem]) -> str:
     
     return summary
 
+def build_top_news(snapshot: NewsSnapshot, rng: random.Random) -> NewsResponse:
+    """Pick the TOP news of a snapshot: per-source quotas of distinct stories plus one M谷 article"""
+    # stamped with the snapshot time, so a variant's body is the same in every worker
+    mizutani_article = generate_mizutani_article(rng, published=snapshot.refreshed_at)
+    
+    selected_rss = sources.select(snapshot.stories_by_source, rng)
+    selected_news = selected_rss + [mizutani_article]
+    
+    overall_summary = generate_overall_summary(selected_news)
+    
+    return NewsResponse(
+        success=True,
+        data=selected_news,
+        count=len(selected_news),
+        generated_at=snapshot.refreshed_at.strftime("%Y-%m-%d %H:%M:%S"),
+        overall_summary=overall_summary
+    )
+
+def serialize(endpoint: str, build: Callable[[], NewsResponse]) -> bytes:
+    with RESPONSE_SERIALIZE_SECONDS.time(endpoint=endpoint):
+        return build().model_dump_json().encode()
+
+def build_news_page(snapshot: NewsSnapshot, limit: int, category: Optional[str], source: Optional[str], cursor: Optional[str]) -> NewsResponse:
+    page = snapshot.page(limit, category=category, source=source, cursor=cursor)
+    return NewsResponse(
+        success=True,
+        data=page.items,
+        count=len(page.items),
+        generated_at=snapshot.refreshed_at.strftime("%Y-%m-%d %H:%M:%S"),
+        overall_summary=generate_overall_summary(page.items),
+        next_cursor=page.next_cursor,
+    )
+
 @app.get("/api/news", response_model=NewsResponse)
-async def get_news():
-    """Get latest TOP6 news including Mizutani articles with fresh content on each request"""
-    try:
-        rss_news = fetch_rss_news()
-        mizutani_article = generate_mizutani_article()
-        
-        nhk_news = [item for item in rss_news if item.source == "NHKニュース"]
-        other_news = [item for item in rss_news if item.source != "NHKニュース"]
-        
-        selected_rss = []
-        
-        if len(nhk_news) >= 4:
-            selected_rss.extend(random.sample(nhk_news, 4))
+async def get_news(
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    variant: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get latest TOP6 news including Mizutani articles, picked from the latest feed snapshot.
+
+    Every snapshot has TOP_VARIANTS different TOP6 picks; `variant` chooses one
+    (a random one when omitted), so the refresh button can ask for new content.
+    When any of category, source, limit or cursor is given, the snapshot is instead
+    listed newest first, filtered and paged with the returned next_cursor.
+
+    Responses only change with the snapshot, so their JSON is serialized once per
+    snapshot and served with an ETag; a matching If-None-Match gets a 304.
+    """
+    snapshot = snapshots.snapshot
+
+    if category is not None or source is not None or limit is not None or cursor is not None:
+        limit = limit or DEFAULT_PAGE_SIZE
+        try:
+            cached = response_cache.get_or_build(
+                snapshot,
+                ("page", category, source, limit, cursor),
+                lambda: serialize("page", lambda: build_news_page(snapshot, limit, category, source, cursor)),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return cached_response(cached, if_none_match)
+
+    if variant is None:
+        # any variant of the current snapshot is as fresh as the one we would pick
+        for candidate in range(TOP_VARIANTS):
+            if etag_matches(if_none_match, make_etag(snapshot, "top", candidate)):
+                variant = candidate
+                break
         else:
-            selected_rss.extend(nhk_news)
-        
-        remaining_slots = 5 - len(selected_rss)
-        if remaining_slots > 0 and other_news:
-            if len(other_news) >= remaining_slots:
-                selected_rss.extend(random.sample(other_news, remaining_slots))
-            else:
-                selected_rss.extend(other_news)
-        
-        if len(selected_rss) < 5 and len(nhk_news) > 4:
-            remaining_slots = 5 - len(selected_rss)
-            remaining_nhk = [item for item in nhk_news if item not in selected_rss]
-            if remaining_nhk:
-                selected_rss.extend(remaining_nhk[:remaining_slots])
-        
-        selected_news = selected_rss + [mizutani_article]
-        selected_news = selected_news[:6]
-        
-        overall_summary = generate_overall_summary(selected_news)
-        
-        return NewsResponse(
-            success=True,
-            data=selected_news,
-            count=len(selected_news),
-            generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            overall_summary=overall_summary
+            variant = random.randrange(TOP_VARIANTS)
+    variant %= TOP_VARIANTS
+
+    try:
+        cached = response_cache.get_or_build(
+            snapshot,
+            ("top", variant),
+            lambda: serialize("top", lambda: build_top_news(snapshot, random.Random(f"{snapshot.version}:{variant}"))),
         )
+        return cached_response(cached, if_none_match)
         
-    except Exception as e:
-        return NewsResponse(
+    except Exception:
+        logger.exception("Error building TOP news", extra={"snapshot_version": snapshot.version, "variant": variant})
+        error_response = NewsResponse(
             success=False,
             data=[],
             count=0,
             generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             overall_summary="ニュースの取得中にエラーが発生しました。"
         )
+        return Response(content=error_response.model_dump_json(), media_type="application/json", headers={"Cache-Control": "no-store"})
+
+@app.get("/api/news/history", response_model=NewsHistoryResponse)
+async def get_news_history(
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+    before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Get stored articles, newest first, served straight from the article store"""
+    if store is None:
+        raise HTTPException(status_code=503, detail="Article history is not enabled")
+    if before is not None and before.tzinfo is None:
+        before = before.astimezone()
+    items = await asyncio.to_thread(store.recent, limit=limit, category=category, source=source, before=before)
+    return NewsHistoryResponse(success=True, data=items, count=len(items))
+
+@app.get("/api/news/stream")
+async def stream_news(request: Request):
+    """Server-Sent Events stream of newly ingested articles.
+
+    Each `news` event carries a JSON array of the NewsItems that appeared since the
+    previous snapshot; comment lines keep idle connections alive.
+    """
+    async def events():
+        with broadcaster.subscribe() as queue:
+            yield "retry: 10000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/search", response_model=SearchResponse)
+async def search_news(
+    q: str = Query(..., min_length=1, max_length=100),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Full-text search over every article ingested so far, best matches first"""
+    # scoring can take a while on a large index; keep it off the event loop
+    results = await asyncio.to_thread(search_index.search, q, offset=offset, limit=limit)
+    next_offset = offset + len(results.items)
+    return SearchResponse(
+        success=True,
+        query=q,
+        total=results.total,
+        data=results.items,
+        count=len(results.items),
+        next_offset=next_offset if next_offset < results.total else None,
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics for feed ingestion, caches and request handling"""
+    return PlainTextResponse(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
 @app.get("/healthz")
 async def healthz():
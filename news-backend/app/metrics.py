@@ -0,0 +1,205 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+# Stages range from sub-millisecond classification to multi-second feed downloads.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    """A named metric family with a fixed set of label names"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Mapping[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type}\n"
+        return header + "".join(f"{sample}\n" for sample in self.samples())
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class CallbackCounter(Metric):
+    """A counter whose values are read from elsewhere (e.g. a cache's hit count) at scrape time"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], read: Callable[[], Mapping[LabelValues, float]]):
+        super().__init__(name, documentation, labelnames)
+        self._read = read
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._read().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (non-cumulative, last one is +Inf)], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = self._values[key]
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the block, whether or not it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class Registry:
+    """The set of metrics exported by /metrics, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+REGISTRY = Registry()
+
+FEED_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "news_feed_fetch_seconds", "Time to download and parse one feed, including 304 answers.", ("feed",),
+))
+FEED_PARSE_SECONDS = REGISTRY.register(Histogram(
+    "news_feed_parse_seconds", "Time spent parsing one downloaded feed document, by the fast path and/or feedparser.", ("feed",),
+))
+ENTRY_NORMALIZE_SECONDS = REGISTRY.register(Histogram(
+    "news_entry_normalize_seconds", "Time to clean and truncate one entry's summary.",
+))
+ENTRY_CLASSIFY_SECONDS = REGISTRY.register(Histogram(
+    "news_entry_classify_seconds", "Time to classify one entry's title.",
+))
+RESPONSE_SERIALIZE_SECONDS = REGISTRY.register(Histogram(
+    "news_response_serialize_seconds", "Time to build and serialize an uncached response body.", ("endpoint",),
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "news_http_request_seconds", "Time to produce response headers, by route and status.", ("route", "method", "status"),
+))
+ENTRIES_INGESTED = REGISTRY.register(Counter(
+    "news_entries_ingested_total", "Feed entries turned into articles, including ones served from the entry cache.", ("feed",),
+))
+FEED_PARSE_FALLBACKS = REGISTRY.register(Counter(
+    "news_feed_parse_fallbacks_total", "Documents of feeds with parser = \"fast\" that had to be parsed by feedparser.", ("feed",),
+))
+FEED_ERRORS = REGISTRY.register(Counter(
+    "news_feed_errors_total", "Failed feed refreshes, by exception type.", ("feed", "error"),
+))
+FEED_CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    "news_feed_circuit_open", "1 while a feed's circuit breaker is skipping fetches, 0 otherwise.", ("feed",),
+))
+FEED_STALE_DROPS = REGISTRY.register(Counter(
+    "news_feed_stale_drops_total", "Times a failing feed's last good entries were dropped for exceeding max_staleness.", ("feed",),
+))
+
+_caches: Dict[str, object] = {}
+
+def register_cache(name: str, cache) -> None:
+    """Export the hit and miss counts of a TTLCache (anything with `hits` and `misses`)"""
+    _caches[name] = cache
+
+def _cache_requests() -> Dict[LabelValues, float]:
+    values: Dict[LabelValues, float] = {}
+    for name, cache in list(_caches.items()):
+        values[(name, "hit")] = cache.hits
+        values[(name, "miss")] = cache.misses
+    return values
+
+CACHE_REQUESTS = REGISTRY.register(CallbackCounter(
+    "news_cache_requests_total", "Lookups in the in-process caches, by result.", ("cache", "result"), _cache_requests,
+))
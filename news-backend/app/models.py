@@ -0,0 +1,32 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class NewsItem(BaseModel):
+    title: str
+    summary: str
+    published: str
+    source: str
+    url: str
+    image_url: str
+    category: str = "経済"
+
+class NewsResponse(BaseModel):
+    success: bool
+    data: List[NewsItem]
+    count: int
+    generated_at: str
+    overall_summary: str
+    next_cursor: Optional[str] = None
+
+class NewsHistoryResponse(BaseModel):
+    success: bool
+    data: List[NewsItem]
+    count: int
+
+class SearchResponse(BaseModel):
+    success: bool
+    query: str
+    total: int
+    data: List[NewsItem]
+    count: int
+    next_offset: Optional[int] = None
@@ -0,0 +1,60 @@
+import html
+import re
+import unicodedata
+from datetime import datetime, timezone
+from dateutil import parser as date_parser
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+SUMMARY_MAX_LENGTH = 280  # summaries are cut back to this many characters...
+SUMMARY_TRUNCATE_THRESHOLD = 300  # ...once they are longer than this
+SUMMARY_MIN_LENGTH = 50  # shorter summaries are replaced with the source's fallback text
+SUMMARY_MIN_SENTENCE_CUT = 100  # a sentence-boundary cut shorter than this falls back to a hard cut
+
+def normalize_text(text: str) -> str:
+    """Fold full-width/half-width forms and case so 'ＡＩ' and 'ai' compare equal"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+def strip_html(text: str) -> str:
+    """Remove HTML tags and decode character entities"""
+    return html.unescape(_TAG_RE.sub('', text))
+
+def truncate_summary(summary: str, max_length: int = SUMMARY_MAX_LENGTH) -> str:
+    """Cut a summary at the last sentence end (。) that fits within max_length.
+
+    Only the first max_length characters are scanned, so the cost does not depend
+    on how long the original summary is.
+    """
+    cut = summary.rfind('。', 0, max_length) + 1
+    if cut > SUMMARY_MIN_SENTENCE_CUT:
+        return summary[:cut]
+    return summary[:max_length]
+
+def normalize_summary(raw_summary: str, title: str, short_summary: str) -> str:
+    """Turn a raw feed summary into plain text of a readable length.
+
+    `short_summary` is a format string with a `{title}` placeholder used when
+    the feed provides little or no summary text.
+    """
+    summary = strip_html(raw_summary)
+    if len(summary) > SUMMARY_TRUNCATE_THRESHOLD:
+        return truncate_summary(summary)
+    if len(summary) < SUMMARY_MIN_LENGTH:
+        return short_summary.format(title=title)
+    return summary
+
+def parse_published(published: str) -> datetime:
+    """Parse a feed's published string into an aware UTC datetime.
+
+    Feeds use RFC 822 or ISO 8601 dates. Naive values, such as the local
+    "%Y-%m-%d %H:%M:%S" stamp given to undated entries, are read as local time,
+    and unparseable values fall back to now.
+    """
+    try:
+        parsed = date_parser.parse(published)
+        if parsed.tzinfo is None:
+            parsed = parsed.astimezone()
+        # converting dates at the ends of the calendar, such as 0001-01-01, overflows
+        return parsed.astimezone(timezone.utc)
+    except (ValueError, OverflowError):
+        return datetime.now(timezone.utc)
@@ -0,0 +1,189 @@
+import asyncio
+import httpx
+import logging
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+from app.breaker import CircuitBreaker
+from app.feeds import FeedSource, FeedState, create_entry_cache, create_http_client, fetch_feed
+from app.metrics import FEED_CIRCUIT_OPEN, FEED_ERRORS, FEED_STALE_DROPS, register_cache
+from app.snapshot import NewsSnapshot
+from app.store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+class FeedRefresher:
+    """Polls each feed on its own interval and publishes a fresh NewsSnapshot after every update"""
+
+    def __init__(self, feed_sources: Sequence[FeedSource], store: Optional[ArticleStore] = None):
+        self._feed_sources = list(feed_sources)
+        self._store = store
+        self._results: Dict[str, FeedState] = {}
+        # articles loaded from the store or seeded at startup, per feed URL, until that feed
+        # answers; they expire after max_staleness like any other entries of a failing feed
+        self._warm: Dict[str, FeedState] = {}
+        self._snapshot = NewsSnapshot.build(0, [])
+        self._tasks: List[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        self._entry_cache = create_entry_cache()
+        register_cache("entries", self._entry_cache)
+        self._listeners: List[Callable[[NewsSnapshot, NewsSnapshot], None]] = []
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # fetch in progress per feed URL, shared by concurrent refresh() calls
+        self._in_flight: Dict[str, "asyncio.Task[Optional[NewsSnapshot]]"] = {}
+
+    @property
+    def snapshot(self) -> NewsSnapshot:
+        return self._snapshot
+
+    def feed_states(self) -> Dict[str, FeedState]:
+        """Entries served for each feed that has any, in feed order, as in the current snapshot"""
+        states = {}
+        for feed_source in self._feed_sources:
+            state = self._served(feed_source.url)
+            if state.items:
+                states[feed_source.url] = state
+        return states
+
+    def seed(self, states: Mapping[str, FeedState]) -> None:
+        """Serve `states` (per feed URL) from start() until each feed answers, like stored articles"""
+        urls = {feed_source.url for feed_source in self._feed_sources}
+        self._warm = {url: state for url, state in states.items() if url in urls and state.items}
+
+    def add_listener(self, listener: Callable[[NewsSnapshot, NewsSnapshot], None]) -> None:
+        """Call `listener(previous, current)` on the event loop whenever a new snapshot is published"""
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        """Load every feed once, then keep each one fresh in the background.
+
+        With seeded entries or a store, the last known articles are served right
+        away and the initial fetch happens in the background instead of delaying
+        startup.
+        """
+        self._client = create_http_client()
+        if self._store is not None:
+            await self._load_warm()
+        if self._warm:
+            self._publish()
+        else:
+            await asyncio.gather(*(self.refresh(feed_source) for feed_source in self._feed_sources))
+        self._tasks = [
+            asyncio.create_task(self._run(feed_source, initial_delay=0 if self._warm else None))
+            for feed_source in self._feed_sources
+        ]
+
+    async def stop(self) -> None:
+        tasks = self._tasks + list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def refresh(self, feed_source: FeedSource) -> Optional[NewsSnapshot]:
+        """Re-fetch one feed and publish a new snapshot if its entries changed.
+
+        Concurrent calls for the same feed URL share one fetch. On failure, or when
+        the feed answers 304 Not Modified, the previous entries are kept.
+        """
+        task = self._in_flight.get(feed_source.url)
+        if task is None:
+            task = asyncio.create_task(self._refresh(feed_source))
+            self._in_flight[feed_source.url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(feed_source.url, None))
+        # one caller giving up must not cancel the fetch the others are waiting for
+        return await asyncio.shield(task)
+
+    async def _refresh(self, feed_source: FeedSource) -> Optional[NewsSnapshot]:
+        previous = self._served(feed_source.url)
+        breaker = self._breaker(feed_source)
+        if not breaker.allow():
+            return self._expire(feed_source, previous)
+        try:
+            state = await fetch_feed(self._client, feed_source, previous, self._entry_cache)
+        except Exception as e:
+            breaker.record_failure()
+            FEED_CIRCUIT_OPEN.set(int(not breaker.allow()), feed=feed_source.url)
+            FEED_ERRORS.inc(feed=feed_source.url, error=type(e).__name__)
+            logger.warning("Error fetching feed: %r", e, extra={"feed": feed_source.url, "circuit": breaker.state})
+            return self._expire(feed_source, previous)
+        breaker.record_success()
+        FEED_CIRCUIT_OPEN.set(0, feed=feed_source.url)
+
+        self._results[feed_source.url] = state._replace(fetched_at=time.time())
+        if state.items == previous.items:
+            return None
+        if self._store is not None:
+            try:
+                await asyncio.to_thread(self._store.upsert, state.items, feed_source.url)
+            except Exception:
+                logger.exception("Error storing articles", extra={"feed": feed_source.url})
+        return self._publish()
+
+    def _served(self, url: str) -> FeedState:
+        """The feed's last fetch or, until it has answered, its warm entries"""
+        if url in self._results:
+            return self._results[url]
+        return self._warm.get(url, FeedState())
+
+    def _breaker(self, feed_source: FeedSource) -> CircuitBreaker:
+        breaker = self._breakers.get(feed_source.url)
+        if breaker is None:
+            # open for at least one skipped poll, and back off to half an hour at most
+            open_seconds = 2 * feed_source.refresh_interval
+            breaker = self._breakers[feed_source.url] = CircuitBreaker(
+                open_seconds=open_seconds, max_open_seconds=max(open_seconds, 30 * 60.0),
+            )
+        return breaker
+
+    def _expire(self, feed_source: FeedSource, previous: FeedState) -> Optional[NewsSnapshot]:
+        """Drop a failing feed's last good entries once they are older than its max_staleness"""
+        age = time.time() - previous.fetched_at
+        if not previous.items or age <= feed_source.max_staleness:
+            return None
+        FEED_STALE_DROPS.inc(feed=feed_source.url)
+        logger.warning("Dropping stale entries of failing feed", extra={"feed": feed_source.url, "age_seconds": round(age)})
+        # forget the validators too, so the next 304 cannot bring the dropped entries back
+        self._results[feed_source.url] = FeedState()
+        return self._publish()
+
+    async def _run(self, feed_source: FeedSource, initial_delay: Optional[float] = None) -> None:
+        delay = feed_source.refresh_interval if initial_delay is None else initial_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh(feed_source)
+            except Exception:
+                # an unexpected error must not end this feed's polling for good
+                logger.exception("Error refreshing feed", extra={"feed": feed_source.url})
+            delay = feed_source.refresh_interval
+
+    async def _load_warm(self) -> None:
+        warm = dict(self._warm)
+        try:
+            for feed_source in self._feed_sources:
+                if feed_source.url in warm:
+                    continue
+                items = await asyncio.to_thread(self._store.recent, limit=feed_source.max_entries, feed=feed_source.url)
+                if items:
+                    warm[feed_source.url] = FeedState(items=tuple(items), fetched_at=time.time())
+        except Exception:
+            logger.exception("Error loading stored articles")
+            return
+        self._warm = warm
+
+    def _publish(self) -> NewsSnapshot:
+        items = []
+        for feed_source in self._feed_sources:
+            items.extend(self._served(feed_source.url).items)
+        previous = self._snapshot
+        self._snapshot = NewsSnapshot.build(previous.version + 1, items)
+        for listener in self._listeners:
+            try:
+                listener(previous, self._snapshot)
+            except Exception:
+                logger.exception("Error in snapshot listener %r", listener)
+        return self._snapshot
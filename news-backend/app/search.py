@@ -0,0 +1,184 @@
+import heapq
+import marshal
+import math
+import os
+import threading
+import zlib
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from app.models import NewsItem
+from app.normalize import normalize_text, parse_published
+from app.snapshot import NewsSnapshot
+
+NGRAM_SIZES = (1, 2, 3)
+TITLE_WEIGHT = 3.0
+SUMMARY_WEIGHT = 1.0
+MAX_CANDIDATES = 5000  # most recently indexed articles a query scores at most
+
+_FILE_MAGIC = b"NGIDX2\n"
+_V1_FILE_MAGIC = b"NGIDX1\n"  # no unigram postings; such files are reindexed on load
+
+def ngrams(text: str) -> Set[str]:
+    return {text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)}
+
+class SearchResults(NamedTuple):
+    total: int
+    items: List[NewsItem]
+
+class NgramIndex:
+    """In-process inverted index over character 1- to 3-grams of title and summary.
+
+    Japanese text has no word boundaries, so every 1-, 2- and 3-character window
+    is a term. A query term is looked up through its rarest n-gram, and the
+    candidates are verified with a substring check, which keeps lookups
+    proportional to the rarest posting list rather than the index size.
+    Documents are only ever appended, so posting lists stay sorted by document
+    id, and a search can score its candidates outside the lock.
+    """
+
+    def __init__(self):
+        self._items: List[NewsItem] = []
+        self._texts: List[Tuple[str, str]] = []  # normalized (title, summary)
+        self._published: List[float] = []
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, items: Sequence[NewsItem], published: Optional[Sequence[float]] = None) -> int:
+        """Index articles not seen before (by URL); returns how many were added.
+
+        `published` may carry the items' already-parsed publish timestamps.
+        """
+        added = 0
+        with self._lock:
+            for position, item in enumerate(items):
+                if not item.url or item.url in self._ids:
+                    continue
+                doc_id = len(self._items)
+                title, summary = normalize_text(item.title), normalize_text(item.summary)
+                self._ids[item.url] = doc_id
+                self._items.append(item)
+                self._texts.append((title, summary))
+                self._published.append(
+                    published[position] if published is not None else parse_published(item.published).timestamp()
+                )
+                for gram in ngrams(title) | ngrams(summary):
+                    postings = self._postings.get(gram)
+                    if postings is None:
+                        postings = self._postings[gram] = array("I")
+                    postings.append(doc_id)
+                added += 1
+            if added:
+                self.dirty = True
+        return added
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> SearchResults:
+        """Rank articles containing every whitespace-separated term of `query`.
+
+        A term in the title counts TITLE_WEIGHT, in the summary SUMMARY_WEIGHT, each
+        scaled by how rare the term is; ties go to the newer article. A query as
+        common as a single kana only looks at the MAX_CANDIDATES most recently
+        indexed articles that may match, and `total` counts matches among those.
+        """
+        terms = [term for term in normalize_text(query).split() if term]
+        if not terms:
+            return SearchResults(0, [])
+
+        with self._lock:
+            total_docs = len(self._items)
+            candidates: Optional[Sequence[int]] = None
+            rarity: Dict[str, float] = {}
+            for term in terms:
+                term_candidates = self._candidates(term)
+                rarity[term] = math.log(1 + total_docs / (1 + len(term_candidates)))
+                if candidates is None or len(term_candidates) < len(candidates):
+                    candidates = term_candidates
+            # a copy, so add() can keep appending while the candidates are scored;
+            # posting lists are in indexing order, so the tail is the newest articles
+            candidates = array("I", candidates[-MAX_CANDIDATES:] if candidates else ())
+
+        texts, published = self._texts, self._published
+        weights = [(term, rarity[term] * TITLE_WEIGHT, rarity[term] * SUMMARY_WEIGHT) for term in terms]
+        scored = []
+        for doc_id in candidates:
+            title, summary = texts[doc_id]
+            score = 0.0
+            for term, title_weight, summary_weight in weights:
+                in_title, in_summary = term in title, term in summary
+                if not (in_title or in_summary):
+                    break
+                score += title_weight * in_title + summary_weight * in_summary
+            else:
+                scored.append((-score, -published[doc_id], doc_id))
+        page = heapq.nsmallest(offset + limit, scored)[offset:]
+        return SearchResults(len(scored), [self._items[doc_id] for _, _, doc_id in page])
+
+    def _candidates(self, term: str) -> Sequence[int]:
+        """Documents that may contain `term`: the posting list of its rarest n-gram"""
+        best: Optional[Sequence[int]] = None
+        for gram in ngrams(term):
+            postings = self._postings.get(gram)
+            if postings is None:
+                return ()
+            if best is None or len(postings) < len(best):
+                best = postings
+        return best if best is not None else ()
+
+    def save(self, path: str) -> None:
+        """Write the index atomically in a compact binary form"""
+        with self._lock:
+            data = {
+                "items": [
+                    (item.title, item.summary, item.published, item.source, item.url, item.image_url, item.category)
+                    for item in self._items
+                ],
+                "published": array("d", self._published).tobytes(),
+                "postings": {gram: postings.tobytes() for gram, postings in self._postings.items()},
+                "itemsize": array("I").itemsize,
+            }
+            self.dirty = False
+        payload = _FILE_MAGIC + zlib.compress(marshal.dumps(data), 1)
+        # per process, so workers sharing `path` never write the same temporary file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NgramIndex":
+        """Read an index written by save(); the n-grams are not recomputed"""
+        with open(path, "rb") as f:
+            payload = f.read()
+        if not payload.startswith((_FILE_MAGIC, _V1_FILE_MAGIC)):
+            raise ValueError(f"{path} is not a search index file")
+        data = marshal.loads(zlib.decompress(payload[len(_FILE_MAGIC):]))
+        if data["itemsize"] != array("I").itemsize:
+            raise ValueError(f"{path} was written on an incompatible platform")
+
+        # written by save() from validated items, so skip re-validation
+        items = [
+            NewsItem.model_construct(title=title, summary=summary, published=published, source=source, url=url, image_url=image_url, category=category)
+            for title, summary, published, source, url, image_url, category in data["items"]
+        ]
+        index = cls()
+        if payload.startswith(_V1_FILE_MAGIC):
+            index.add(items, array("d", data["published"]).tolist())
+            return index
+        for doc_id, item in enumerate(items):
+            index._items.append(item)
+            index._texts.append((normalize_text(item.title), normalize_text(item.summary)))
+            index._ids[item.url] = doc_id
+        index._published = array("d", data["published"]).tolist()
+        for gram, raw in data["postings"].items():
+            postings = array("I")
+            postings.frombytes(raw)
+            index._postings[gram] = postings
+        return index
+
+    def on_snapshot(self, previous: NewsSnapshot, current: NewsSnapshot) -> None:
+        self.add(current.latest.items, [-key[0] for key in current.latest.keys])
@@ -0,0 +1,236 @@
+import asyncio
+import dataclasses
+import fcntl
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.feeds import FeedState
+from app.models import NewsItem
+from app.refresher import FeedRefresher
+from app.snapshot import NewsSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.bin"
+LOCK_FILE = "leader.lock"
+
+# magic, version, refreshed_at (POSIX seconds), body length; the body is a JSON array of
+# SharedFeeds in feed order, whose items concatenated are the snapshot's items
+_HEADER = struct.Struct("<8sQdQ")
+_MAGIC = b"NEWSSNP2"
+
+class SharedFeed(BaseModel):
+    url: str
+    fetched_at: float
+    items: List[NewsItem]
+
+_shared_feeds = TypeAdapter(List[SharedFeed])
+
+def write_snapshot_file(path: Path, version: int, snapshot: NewsSnapshot, feeds: Mapping[str, FeedState]) -> None:
+    """Atomically replace `path` with `snapshot`, made of `feeds` (per feed URL), stored as `version`"""
+    body = _shared_feeds.dump_json(
+        [SharedFeed(url=url, fetched_at=state.fetched_at, items=list(state.items)) for url, state in feeds.items()]
+    )
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, version, snapshot.refreshed_at.timestamp(), len(body)))
+        f.write(body)
+    os.replace(tmp_path, path)
+
+def read_snapshot_version(path: Path) -> int:
+    """Version stored in the snapshot file, or 0 when there is none yet"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return 0
+    if len(header) < _HEADER.size:
+        return 0
+    magic, version, _, _ = _HEADER.unpack(header)
+    return version if magic == _MAGIC else 0
+
+def read_snapshot_file(path: Path, known_version: Optional[int] = None) -> Optional[NewsSnapshot]:
+    """Load the snapshot in `path`, or return None when it still has `known_version`.
+
+    The file is memory-mapped, so checking the version touches only the header
+    page and the body is decoded straight from the mapping.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, version, refreshed_at, length = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        if version == known_version:
+            return None
+        feeds = _shared_feeds.validate_json(mapped[_HEADER.size:_HEADER.size + length])
+    snapshot = NewsSnapshot.build(version, [item for feed in feeds for item in feed.items])
+    return dataclasses.replace(snapshot, refreshed_at=datetime.fromtimestamp(refreshed_at))
+
+def read_feed_states(path: Path) -> Dict[str, FeedState]:
+    """Entries per feed URL in the snapshot file, or nothing when there is none yet"""
+    try:
+        with open(path, "rb") as f:
+            magic, _, _, length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a snapshot file")
+            feeds = _shared_feeds.validate_json(f.read(length))
+    except FileNotFoundError:
+        return {}
+    return {feed.url: FeedState(items=tuple(feed.items), fetched_at=feed.fetched_at) for feed in feeds}
+
+class SharedSnapshot:
+    """Shares one worker's feed refresher with every other worker process through a file.
+
+    All workers point at the same directory. The first to take an exclusive
+    flock on its lock file becomes the leader: it runs the FeedRefresher and
+    writes each new snapshot to a versioned file there, atomically. The others
+    only stat that file and reload it when its version changes, so upstream
+    traffic and the entry cache stay those of a single process however many
+    workers run. The lock is released when the leader exits, and the next
+    follower to try the lock takes over, serving the entries of the last shared
+    snapshot until each feed answers it (or they pass the feed's max_staleness),
+    so an upstream outage during the handover does not empty the snapshot.
+
+    It has the same interface as FeedRefresher (snapshot, add_listener, start,
+    stop), and every worker serves snapshots numbered by the shared file
+    version, so ETags agree across workers.
+    """
+
+    def __init__(self, directory: os.PathLike, refresher: FeedRefresher, poll_interval: float = 1.0, startup_timeout: float = 30.0):
+        self._directory = Path(directory)
+        self._path = self._directory / SNAPSHOT_FILE
+        self._refresher = refresher
+        self._poll_interval = poll_interval
+        self._startup_timeout = startup_timeout
+        self._snapshot = refresher.snapshot
+        self._version: Optional[int] = None
+        self._file_signature: Optional[Tuple[int, int, int]] = None
+        self._lock_fd: Optional[int] = None
+        self._leading = False
+        self._poller: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[NewsSnapshot, NewsSnapshot], None]] = []
+        refresher.add_listener(self._on_refresh)
+
+    @property
+    def snapshot(self) -> NewsSnapshot:
+        return self._snapshot
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def add_listener(self, listener: Callable[[NewsSnapshot, NewsSnapshot], None]) -> None:
+        """Call `listener(previous, current)` whenever this worker picks up a new snapshot"""
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        """Lead or follow. A follower waits up to startup_timeout for the leader's first snapshot."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._startup_timeout
+        while True:
+            if self._try_lock():
+                await self._lead()
+                break
+            if await self._reload():
+                break
+            if loop.time() >= deadline:
+                logger.warning("No shared snapshot yet; starting empty", extra={"path": str(self._path)})
+                break
+            await asyncio.sleep(min(self._poll_interval, 0.1))
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        if self.is_leader:
+            await self._refresher.stop()
+            self._leading = False
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self._directory / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _lead(self) -> None:
+        logger.info("Elected snapshot leader", extra={"pid": os.getpid(), "path": str(self._path)})
+        # carry on from the previous leader's numbering so followers always see a new version
+        self._version = max(self._version or 0, read_snapshot_version(self._path))
+        try:
+            self._refresher.seed(await asyncio.to_thread(read_feed_states, self._path))
+        except Exception:
+            logger.exception("Error reading shared snapshot", extra={"path": str(self._path)})
+        await self._refresher.start()
+        self._leading = True
+        self._share(self._refresher.snapshot)
+
+    def _on_refresh(self, previous: NewsSnapshot, current: NewsSnapshot) -> None:
+        # during start() the refresher publishes one snapshot per feed; share only complete ones
+        if self._leading:
+            self._share(current)
+
+    def _share(self, snapshot: NewsSnapshot) -> None:
+        version = (self._version or 0) + 1
+        try:
+            write_snapshot_file(self._path, version, snapshot, self._refresher.feed_states())
+        except OSError:
+            logger.exception("Error writing shared snapshot", extra={"path": str(self._path)})
+        self._version = version
+        self._publish(dataclasses.replace(snapshot, version=version))
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            if self.is_leader:
+                continue
+            try:
+                if self._try_lock():
+                    await self._lead()
+                else:
+                    await self._reload()
+            except Exception:
+                logger.exception("Error following shared snapshot", extra={"path": str(self._path)})
+
+    async def _reload(self) -> bool:
+        """Pick up the shared file if it changed since the last look; returns whether a snapshot is loaded"""
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return self._version is not None
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._file_signature:
+            return True
+        try:
+            snapshot = await asyncio.to_thread(read_snapshot_file, self._path, self._version)
+        except Exception:
+            logger.exception("Error reading shared snapshot", extra={"path": str(self._path)})
+            return self._version is not None
+        self._file_signature = signature
+        if snapshot is not None:
+            self._version = snapshot.version
+            self._publish(snapshot)
+        return True
+
+    def _publish(self, snapshot: NewsSnapshot) -> None:
+        previous = self._snapshot
+        self._snapshot = snapshot
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception:
+                logger.exception("Error in snapshot listener %r", listener)
@@ -0,0 +1,132 @@
+import base64
+import hashlib
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.dedup import cluster_stories
+from app.models import NewsItem
+from app.normalize import parse_published
+
+SortKey = Tuple[float, str]  # (-published timestamp, article id): ascending order is newest first
+
+def article_id(url: str) -> str:
+    """Stable short identifier for an article, derived from its URL"""
+    return hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+
+def encode_cursor(key: SortKey) -> str:
+    return base64.urlsafe_b64encode(f"{-key[0]!r}|{key[1]}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Inverse of encode_cursor(); raises ValueError for malformed cursors"""
+    try:
+        published, item_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|", 1)
+        return -float(published), item_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+class SortedIndex(NamedTuple):
+    keys: Tuple[SortKey, ...]
+    items: Tuple[NewsItem, ...]
+
+class NewsPage(NamedTuple):
+    items: List[NewsItem]
+    next_cursor: Optional[str]
+
+@dataclass(frozen=True)
+class NewsSnapshot:
+    """Immutable, pre-classified view of every feed's latest entries.
+
+    Besides the raw per-source lists, the snapshot keeps one representative per
+    story (near-duplicates across feeds collapsed) per source for TOP-N
+    selection, and every unique article sorted newest first, overall and per
+    category and source, so keyset pages can be cut with a binary search.
+    """
+    version: int
+    items: Tuple[NewsItem, ...]
+    by_source: Mapping[str, Tuple[NewsItem, ...]]
+    stories_by_source: Mapping[str, Tuple[NewsItem, ...]]
+    latest: SortedIndex
+    latest_by_category: Mapping[str, SortedIndex]
+    latest_by_source: Mapping[str, SortedIndex]
+    refreshed_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def build(cls, version: int, items: Sequence[NewsItem]) -> "NewsSnapshot":
+        by_source: Dict[str, List[NewsItem]] = {}
+        for item in items:
+            by_source.setdefault(item.source, []).append(item)
+
+        stories_by_source: Dict[str, List[NewsItem]] = {}
+        for cluster in cluster_stories(items):
+            stories_by_source.setdefault(cluster[0].source, []).append(cluster[0])
+
+        unique: Dict[str, Tuple[SortKey, NewsItem]] = {}
+        for item in items:
+            if item.url not in unique:
+                unique[item.url] = ((-parse_published(item.published).timestamp(), article_id(item.url)), item)
+        ordered = sorted(unique.values(), key=lambda pair: pair[0])
+
+        return cls(
+            version=version,
+            items=tuple(items),
+            by_source=MappingProxyType({source: tuple(group) for source, group in by_source.items()}),
+            stories_by_source=MappingProxyType({source: tuple(group) for source, group in stories_by_source.items()}),
+            latest=_sorted_index(ordered),
+            latest_by_category=_group_index(ordered, lambda item: item.category),
+            latest_by_source=_group_index(ordered, lambda item: item.source),
+        )
+
+    def page(
+        self,
+        limit: int,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> NewsPage:
+        """Return up to `limit` articles newest first, starting after `cursor`"""
+        empty = SortedIndex((), ())
+        if category is not None and source is not None:
+            # walk the smaller index and filter on the other field
+            by_category = self.latest_by_category.get(category, empty)
+            by_source = self.latest_by_source.get(source, empty)
+            if len(by_category.keys) <= len(by_source.keys):
+                index, matches = by_category, lambda item: item.source == source
+            else:
+                index, matches = by_source, lambda item: item.category == category
+        elif category is not None:
+            index, matches = self.latest_by_category.get(category, empty), None
+        elif source is not None:
+            index, matches = self.latest_by_source.get(source, empty), None
+        else:
+            index, matches = self.latest, None
+
+        start = bisect_right(index.keys, decode_cursor(cursor)) if cursor else 0
+        items: List[NewsItem] = []
+        last_key: Optional[SortKey] = None
+        position = start
+        while position < len(index.items) and len(items) < limit:
+            item = index.items[position]
+            if matches is None or matches(item):
+                items.append(item)
+                last_key = index.keys[position]
+            position += 1
+
+        has_more = position < len(index.items)
+        if has_more and matches is not None:
+            # more only if some remaining article passes the filter, or the last page would be empty
+            has_more = any(matches(item) for item in islice(index.items, position, None))
+        next_cursor = encode_cursor(last_key) if has_more and last_key is not None else None
+        return NewsPage(items, next_cursor)
+
+def _sorted_index(ordered: Sequence[Tuple[SortKey, NewsItem]]) -> SortedIndex:
+    return SortedIndex(tuple(key for key, _ in ordered), tuple(item for _, item in ordered))
+
+def _group_index(ordered: Sequence[Tuple[SortKey, NewsItem]], group_of) -> Mapping[str, SortedIndex]:
+    groups: Dict[str, List[Tuple[SortKey, NewsItem]]] = {}
+    for key, item in ordered:
+        groups.setdefault(group_of(item), []).append((key, item))
+    return MappingProxyType({group: _sorted_index(members) for group, members in groups.items()})
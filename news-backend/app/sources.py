@@ -0,0 +1,90 @@
+import os
+import random
+import tomllib
+from pathlib import Path
+from typing import List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from app.feeds import FeedSource
+from app.models import NewsItem
+
+DEFAULT_SOURCES_FILE = Path(__file__).with_name("sources.toml")
+
+PARSERS = ("feedparser", "fast")
+
+class SourceConfig(NamedTuple):
+    """A publisher in the registry together with all of its feeds"""
+    label: str
+    priority: int
+    quota: int  # TOP slots this source fills in /api/news
+    feeds: Tuple[FeedSource, ...]
+
+class SourceRegistry:
+    """Declarative list of feed sources that drives both fetching and TOP-N selection"""
+
+    def __init__(self, sources: Sequence[SourceConfig]):
+        self.sources = sorted(sources, key=lambda source: source.priority)
+
+    @classmethod
+    def load(cls, path: Optional[os.PathLike] = None) -> "SourceRegistry":
+        """Load the registry from a TOML file (NEWS_SOURCES_FILE or the bundled sources.toml)"""
+        path = Path(path or os.environ.get("NEWS_SOURCES_FILE") or DEFAULT_SOURCES_FILE)
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+        return cls([_parse_source(raw) for raw in config.get("sources", [])])
+
+    @property
+    def feeds(self) -> List[FeedSource]:
+        return [feed for source in self.sources for feed in source.feeds]
+
+    @property
+    def total_quota(self) -> int:
+        return sum(source.quota for source in self.sources)
+
+    def select(self, by_source: Mapping[str, Sequence[NewsItem]], rng: random.Random = random) -> List[NewsItem]:
+        """Pick up to `quota` random items per source in priority order.
+
+        Slots a source cannot fill are handed to the remaining items of the other
+        sources, again in priority order.
+        """
+        selected: List[NewsItem] = []
+        leftovers: List[List[NewsItem]] = []
+        for source in self.sources:
+            items = list(by_source.get(source.label, ()))
+            rng.shuffle(items)
+            selected.extend(items[:source.quota])
+            leftovers.append(items[source.quota:])
+
+        for items in leftovers:
+            remaining_slots = self.total_quota - len(selected)
+            if remaining_slots <= 0:
+                break
+            selected.extend(items[:remaining_slots])
+        return selected
+
+def _parse_source(raw: dict) -> SourceConfig:
+    label = raw["label"]
+    feeds = []
+    for raw_feed in raw["feeds"]:
+        if isinstance(raw_feed, str):
+            raw_feed = {"url": raw_feed}
+        feeds.append(FeedSource(
+            url=raw_feed["url"],
+            source=label,
+            max_entries=raw_feed.get("max_entries", raw.get("max_entries", 8)),
+            refresh_interval=raw_feed.get("refresh_interval", raw.get("refresh_interval", 300)),
+            short_summary=raw_feed.get("short_summary", raw.get("short_summary", "{title}に関するニュースです。")),
+            timeout=raw_feed.get("timeout", raw.get("timeout", FeedSource._field_defaults["timeout"])),
+            max_staleness=raw_feed.get("max_staleness", raw.get("max_staleness", FeedSource._field_defaults["max_staleness"])),
+            parser=_parser(raw_feed.get("parser", raw.get("parser", FeedSource._field_defaults["parser"]))),
+        ))
+    return SourceConfig(
+        label=label,
+        priority=raw.get("priority", 100),
+        quota=raw.get("quota", 0),
+        feeds=tuple(feeds),
+    )
+
+def _parser(name: str) -> str:
+    if name not in PARSERS:
+        raise ValueError(f"unknown feed parser {name!r}; expected one of {', '.join(PARSERS)}")
+    return name
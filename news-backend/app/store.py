@@ -0,0 +1,234 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from queue import Empty, LifoQueue
+from typing import Iterator, List, Optional, Sequence
+import psycopg
+
+from app.models import NewsItem
+from app.normalize import parse_published
+
+class ArticleStore:
+    """Persistent article history, deduplicated by URL.
+
+    Subclasses provide connection handling and dialect-specific DDL; the upsert
+    and query statements are shared.
+    """
+
+    placeholder = "%s"
+    schema: Sequence[str] = ()
+
+    _columns = ("url", "title", "summary", "published", "published_at", "source", "category", "image_url", "feed")
+
+    def _connection(self):
+        raise NotImplementedError
+
+    def _executemany(self, conn, sql: str, rows: list) -> None:
+        raise NotImplementedError
+
+    def _to_db_time(self, value: datetime):
+        return value
+
+    def init_schema(self) -> None:
+        with self._connection() as conn:
+            for statement in self.schema:
+                conn.execute(statement)
+
+    def upsert(self, items: Sequence[NewsItem], feed: str = "") -> int:
+        """Insert new articles and refresh existing ones in one batch; returns the number of rows written.
+
+        `feed` is the URL of the feed the items came from, so a feed's last
+        articles can be loaded on their own (see recent).
+        """
+        rows = {}
+        for item in items:
+            if item.url:
+                rows[item.url] = (
+                    item.url, item.title, item.summary, item.published,
+                    self._to_db_time(parse_published(item.published)),
+                    item.source, item.category, item.image_url, feed,
+                )
+        if not rows:
+            return 0
+
+        columns = ", ".join(self._columns)
+        values = ", ".join([self.placeholder] * len(self._columns))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self._columns if column != "url")
+        sql = f"INSERT INTO articles ({columns}) VALUES ({values}) ON CONFLICT (url) DO UPDATE SET {updates}"
+        with self._connection() as conn:
+            self._executemany(conn, sql, list(rows.values()))
+        return len(rows)
+
+    def recent(
+        self,
+        limit: int = 50,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        before: Optional[datetime] = None,
+        feed: Optional[str] = None,
+    ) -> List[NewsItem]:
+        """Newest articles first, optionally filtered by category, source, feed URL and a published-time upper bound"""
+        conditions = []
+        params: list = []
+        if category is not None:
+            conditions.append(f"category = {self.placeholder}")
+            params.append(category)
+        if source is not None:
+            conditions.append(f"source = {self.placeholder}")
+            params.append(source)
+        if feed is not None:
+            conditions.append(f"feed = {self.placeholder}")
+            params.append(feed)
+        if before is not None:
+            conditions.append(f"published_at < {self.placeholder}")
+            params.append(self._to_db_time(before))
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        sql = (
+            "SELECT title, summary, published, source, url, image_url, category FROM articles "
+            f"{where}ORDER BY published_at DESC, id DESC LIMIT {self.placeholder}"
+        )
+        params.append(limit)
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [
+            NewsItem(title=title, summary=summary, published=published, source=source, url=url, image_url=image_url, category=category)
+            for title, summary, published, source, url, image_url, category in rows
+        ]
+
+    def close(self) -> None:
+        pass
+
+class PostgresArticleStore(ArticleStore):
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS articles (
+            id BIGSERIAL PRIMARY KEY,
+            url TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            published TEXT NOT NULL,
+            published_at TIMESTAMPTZ NOT NULL,
+            source TEXT NOT NULL,
+            category TEXT NOT NULL,
+            image_url TEXT NOT NULL,
+            feed TEXT NOT NULL DEFAULT '',
+            ingested_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+        # tables created before articles were tagged with their feed
+        "ALTER TABLE articles ADD COLUMN IF NOT EXISTS feed TEXT NOT NULL DEFAULT ''",
+        "CREATE INDEX IF NOT EXISTS articles_published_at_idx ON articles (published_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS articles_category_idx ON articles (category, published_at DESC)",
+        "CREATE INDEX IF NOT EXISTS articles_source_idx ON articles (source, published_at DESC)",
+        "CREATE INDEX IF NOT EXISTS articles_feed_idx ON articles (feed, published_at DESC)",
+    )
+
+    def __init__(self, conninfo: str, max_size: int = 5):
+        self._conninfo = conninfo
+        self._idle: "LifoQueue[psycopg.Connection]" = LifoQueue()
+        # bounds the number of open connections; a slot is held while a connection is in use
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def _connection(self) -> Iterator[psycopg.Connection]:
+        """Borrow a pooled connection; the transaction commits on success and rolls back on error"""
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                conn = psycopg.connect(self._conninfo, autocommit=True)
+            try:
+                with conn.transaction():
+                    yield conn
+            except BaseException:
+                if conn.closed or conn.broken:
+                    conn.close()
+                    conn = None
+                raise
+            finally:
+                if conn is not None:
+                    self._idle.put(conn)
+
+    def _executemany(self, conn, sql: str, rows: list) -> None:
+        with conn.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+class SQLiteArticleStore(ArticleStore):
+    """Single-file stand-in for local development and tests"""
+
+    placeholder = "?"
+    schema = (
+        """
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            published TEXT NOT NULL,
+            published_at TEXT NOT NULL,
+            source TEXT NOT NULL,
+            category TEXT NOT NULL,
+            image_url TEXT NOT NULL,
+            feed TEXT NOT NULL DEFAULT '',
+            ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS articles_published_at_idx ON articles (published_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS articles_category_idx ON articles (category, published_at DESC)",
+        "CREATE INDEX IF NOT EXISTS articles_source_idx ON articles (source, published_at DESC)",
+        "CREATE INDEX IF NOT EXISTS articles_feed_idx ON articles (feed, published_at DESC)",
+    )
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def init_schema(self) -> None:
+        with self._connection() as conn:
+            # SQLite has no ADD COLUMN IF NOT EXISTS; add the feed column to older tables before indexing it
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+            if columns and "feed" not in columns:
+                conn.execute("ALTER TABLE articles ADD COLUMN feed TEXT NOT NULL DEFAULT ''")
+        super().init_schema()
+
+    @contextmanager
+    def _connection(self) -> Iterator:
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _executemany(self, conn, sql: str, rows: list) -> None:
+        conn.executemany(sql, rows)
+
+    def _to_db_time(self, value: datetime) -> str:
+        # fixed-width UTC strings sort in time order
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def close(self) -> None:
+        self._conn.close()
+
+def open_store(url: Optional[str] = None) -> Optional[ArticleStore]:
+    """Open the article store named by `url` or DATABASE_URL; returns None when persistence is disabled.
+
+    postgres:// and postgresql:// URLs use a pooled PostgreSQL connection,
+    sqlite:///path uses a local SQLite file.
+    """
+    url = url or os.environ.get("DATABASE_URL")
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        store: ArticleStore = SQLiteArticleStore(url[len("sqlite:///"):])
+    elif url.startswith(("postgres://", "postgresql://")):
+        store = PostgresArticleStore(url)
+    else:
+        raise ValueError(f"Unsupported DATABASE_URL scheme: {url.split(':', 1)[0]}")
+    store.init_schema()
+    return store
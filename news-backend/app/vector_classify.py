@@ -0,0 +1,54 @@
+from typing import List, Sequence
+
+import numpy as np
+
+from app.classify import Classification, KeywordMatcher, KeywordRule
+
+class VectorClassifier:
+    """Scores every category of a rule table for a whole batch of titles at once.
+
+    Each keyword of any table is a character n-gram feature. A batch of titles
+    becomes one presence matrix (titles x keywords), filled from the matcher's
+    single regex scan of each title, and the category scores are that matrix
+    times a keywords x categories weight matrix seeded from the category rules:
+    a keyword adds 1 to its category, split evenly when several categories list
+    it. The highest score wins, ties going to the earlier rule, so unlike the
+    first-match chain a title with two medical keywords and one country name is
+    medical, not international. Titles with no keyword get `default`.
+
+    Image and topic keep their first-match semantics (they have `requires`
+    rules) and are resolved from the same keyword sets by `matcher.resolve`.
+    """
+
+    def __init__(self, rules: Sequence[KeywordRule], default: str, matcher: KeywordMatcher):
+        self._categories = [rule.value for rule in rules] + [default]
+        self._matcher = matcher
+        self._keywords = sorted(matcher.keywords)
+        self._columns = {keyword: index for index, keyword in enumerate(self._keywords)}
+
+        self._weights = np.zeros((len(self._keywords), len(rules)), dtype=np.float32)
+        for index, rule in enumerate(rules):
+            for keyword in rule.keywords:
+                self._weights[self._columns[keyword], index] = 1.0
+        shared = self._weights.sum(axis=1, keepdims=True)
+        np.divide(self._weights, shared, out=self._weights, where=shared > 0)
+
+    def features(self, found: Sequence[frozenset]) -> np.ndarray:
+        """Presence matrix of every keyword (columns, sorted) for each title's found keywords (rows)"""
+        presence = np.zeros((len(found), len(self._keywords)), dtype=np.float32)
+        rows = [row for row, keywords in enumerate(found) for _ in keywords]
+        columns = [self._columns[keyword] for keywords in found for keyword in keywords]
+        presence[rows, columns] = 1.0
+        return presence
+
+    def classify(self, titles: Sequence[str]) -> List[Classification]:
+        """Classify `titles` with one feature matrix and one matrix product"""
+        found = [self._matcher.find_keywords(title.lower()) for title in titles]
+        scores = self.features(found) @ self._weights
+        best = scores.argmax(axis=1) if scores.shape[1] else np.zeros(len(titles), dtype=np.int64)
+        best[scores.max(axis=1, initial=0.0) <= 0] = len(self._categories) - 1
+        results = []
+        for keywords, category in zip(found, best.tolist()):
+            _, image_url, topic = self._matcher.resolve(keywords)
+            results.append(Classification(self._categories[category], image_url, topic))
+        return results
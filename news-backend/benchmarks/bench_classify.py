@@ -0,0 +1,61 @@
+"""Compare the compiled keyword matcher against the original if/elif chains.
+
+Run from news-backend/:  python -m benchmarks.bench_classify
+"""
+import random
+import timeit
+
+from app import classify
+from benchmarks import legacy_classify
+
+FILLER = ["政府", "東京都内で", "発表した", "について", "明らかに", "今年", "全国の", "関係者によりますと", "新たな", "見通し", "AI", "EV", "Twitter"]
+
+def all_keywords():
+    rules = classify.CATEGORY_RULES + classify.IMAGE_RULES + classify.TOPIC_RULES
+    return sorted({keyword for rule in rules for keyword in rule.keywords + rule.requires})
+
+def make_titles(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    keywords = all_keywords()
+    titles = []
+    for _ in range(count):
+        parts = rng.sample(FILLER, rng.randint(1, 4))
+        parts += rng.sample(keywords, rng.randint(0, 3))
+        if rng.random() < 0.1:
+            parts.append("M谷氏")
+        rng.shuffle(parts)
+        titles.append("、".join(parts))
+    return titles
+
+def legacy(title: str):
+    return (
+        legacy_classify.get_news_category(title),
+        legacy_classify.get_news_related_image(title),
+        legacy_classify.get_news_topic(title),
+    )
+
+def compiled(title: str):
+    return tuple(classify.classify_title(title))
+
+def check_equivalence(titles):
+    for title in titles:
+        expected, actual = legacy(title), compiled(title)
+        assert expected == actual, f"{title!r}: {expected} != {actual}"
+
+def per_title_us(func, titles, repeat: int = 5) -> float:
+    best = min(timeit.repeat(lambda: [func(title) for title in titles], number=1, repeat=repeat))
+    return best / len(titles) * 1e6
+
+def main():
+    check_equivalence(make_titles(20000, seed=1))
+    print("equivalence: OK (20000 titles)")
+
+    titles = make_titles(2000)
+    legacy_us = per_title_us(legacy, titles)
+    compiled_us = per_title_us(compiled, titles)
+    print(f"legacy if/elif chains: {legacy_us:8.2f} us/title")
+    print(f"compiled matcher:      {compiled_us:8.2f} us/title")
+    print(f"speedup:               {legacy_us / compiled_us:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""End-to-end load test of /api/news against a local feed server, reported as JSON.
+
+Run from news-backend/:  python -m benchmarks.bench_load [--json results.json]
+
+The app is started in a uvicorn subprocess with its registry pointed at
+benchmarks.feed_server, so feed latency, failures and sizes are under control.
+Clients send --requests requests over --concurrency connections and the run
+reports throughput and latency percentiles for each scenario:
+
+  top     GET /api/news (a random TOP6 variant, as the refresh button asks)
+  cached  GET /api/news with If-None-Match of the previous response (304s)
+  page    GET /api/news?limit=20 walking next_cursor
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.sources import PARSERS
+from benchmarks.feed_server import FeedServer, fixture_feeds, recorded_fixtures, write_sources_file
+from benchmarks.results import emit, metric, percentile
+
+SCENARIOS = ("top", "cached", "page")
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    """Poll /healthz until the app answers; it only does once the initial feed fetch is done"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"uvicorn exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/healthz", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    raise SystemExit(f"app did not become ready within {timeout} s")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def run_scenario(base_url: str, scenario: str, requests: int, concurrency: int) -> Dict[str, Dict[str, object]]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        etag: Optional[str] = None
+        cursor: Optional[str] = None
+        for _ in remaining:
+            params, headers = {}, {}
+            if scenario == "cached" and etag:
+                headers["If-None-Match"] = etag
+            elif scenario == "page":
+                params["limit"] = 20
+                if cursor:
+                    params["cursor"] = cursor
+            start = time.perf_counter()
+            try:
+                response = await client.get("/api/news", params=params, headers=headers)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in (200, 304):
+                errors += 1
+            etag = response.headers.get("ETag", etag)
+            if scenario == "page" and response.status_code == 200:
+                cursor = response.json().get("next_cursor")
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    results = {
+        "throughput": metric(len(latencies) / elapsed, "req/s", better="higher"),
+        "errors": metric(errors, "requests"),
+    }
+    if latencies:
+        for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99)):
+            results[name] = metric(percentile(latencies, fraction) * 1e3, "ms")
+        results["max"] = metric(latencies[-1] * 1e3, "ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="repeatable; all by default")
+    parser.add_argument("--items", type=int, default=40, help="entries per synthetic feed")
+    parser.add_argument("--summary-length", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each feed response is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of feed requests answered with 503")
+    parser.add_argument("--refresh-interval", type=float, help="override every feed's polling interval, e.g. 1 to refresh under load")
+    parser.add_argument("--parser", choices=PARSERS, help="override every feed's parser")
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    parser.add_argument("--json", dest="output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    feeds = fixture_feeds(args.items, args.summary_length, recorded=not args.synthetic)
+    with FeedServer(feeds, args.latency, args.jitter, args.failure_rate) as feed_server:
+        sources_file = write_sources_file(feed_server, args.refresh_interval, parser=args.parser)
+        env = dict(os.environ, NEWS_SOURCES_FILE=sources_file)
+        env.pop("DATABASE_URL", None)
+        env.pop("NEWS_SEARCH_INDEX_PATH", None)
+        env.setdefault("LOG_LEVEL", "WARNING")  # one access log line per request would dominate
+
+        # the app gets its own process so the load generator does not compete with it for the GIL
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+            cwd=Path(__file__).resolve().parent.parent,
+            env=env,
+        )
+        try:
+            wait_until_ready(base_url, server)
+            metrics = {"startup": metric((time.perf_counter() - start) * 1e3, "ms")}
+            for scenario in args.scenario or SCENARIOS:
+                results = asyncio.run(run_scenario(base_url, scenario, args.requests, args.concurrency))
+                metrics.update({f"{scenario}.{name}": value for name, value in results.items()})
+        finally:
+            server.terminate()
+            server.wait()
+            os.unlink(sources_file)
+
+        parameters = {key: value for key, value in vars(args).items() if key not in ("output", "scenario")}
+        parameters["scenarios"] = args.scenario or list(SCENARIOS)
+        parameters["recorded_fixtures"] = [] if args.synthetic else sorted(recorded_fixtures())
+        parameters["feed_requests"] = feed_server.requests
+        parameters["feed_failures"] = feed_server.failures
+    emit("load", metrics, parameters, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Micro-benchmarks of the per-entry and per-request stages, reported as JSON.
+
+Run from news-backend/:  python -m benchmarks.bench_micro [--json results.json]
+
+Inputs come from benchmarks.feed_server fixtures (recorded feeds when present,
+synthetic ones otherwise), so results are comparable between commits.
+"""
+import argparse
+import os
+import random
+import timeit
+from typing import Callable, List
+
+import feedparser
+
+from app.classify import ENGINES, classify_batch, classify_title
+from app.feeds import create_entry_cache, parse_feed
+from app.normalize import normalize_summary
+from app.snapshot import NewsSnapshot
+from app.sources import SourceRegistry
+from benchmarks.bench_classify import make_titles
+from benchmarks.feed_server import FIXTURE_NAMES, fixture_feeds, recorded_fixtures
+from benchmarks.results import emit, metric
+
+SHORT_SUMMARY = "{title}に関するニュースです。"
+
+def best_seconds(func: Callable[[], object], repeat: int, number: int = 1) -> float:
+    """Fastest of `repeat` runs of `number` calls, per call"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=40, help="entries per synthetic feed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=8, help="titles per classify_batch call (a feed's max_entries)")
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    parser.add_argument("--json", dest="output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    # app.main opens DATABASE_URL at import; benchmarks stay in memory
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.pop("NEWS_SEARCH_INDEX_PATH", None)
+    from app.main import build_top_news
+
+    feeds = fixture_feeds(items=args.items, recorded=not args.synthetic)
+    entries = [entry for document in feeds.values() for entry in feedparser.parse(document).entries]
+    feed_titles = [entry.title for entry in entries]
+    summaries = [entry.get("summary", entry.get("description", "")) for entry in entries]
+    titles = feed_titles + make_titles(2000)
+
+    metrics = {}
+    metrics["classify_title"] = metric(
+        best_seconds(lambda: [classify_title(title) for title in titles], args.repeat) / len(titles) * 1e6, "us/title",
+    )
+    # a refresh classifies a feed's new entries as one batch; engines that need numpy fall back to rules without it
+    batch = titles[:args.batch]
+    categories = {}
+    for engine in ENGINES:
+        # also builds the engine, so its one-off setup stays out of the timings
+        categories[engine] = [classification.category for classification in classify_batch(titles, engine)]
+        metrics[f"classify_batch_{engine}"] = metric(
+            best_seconds(lambda: classify_batch(batch, engine), args.repeat) / len(batch) * 1e6, "us/title",
+        )
+    agreement = sum(a == b for a, b in zip(categories["rules"], categories["vector"])) / len(titles)
+    metrics["normalize_summary"] = metric(
+        best_seconds(lambda: [normalize_summary(summary, "見出し", SHORT_SUMMARY) for summary in summaries], args.repeat) / len(summaries) * 1e6,
+        "us/entry",
+    )
+
+    registry = SourceRegistry.load()
+    parse_cold: List[float] = []
+    parse_warm: List[float] = []
+    items = []
+    for feed in registry.feeds:
+        document = feeds[FIXTURE_NAMES[feed.url]]
+        feed_source = feed._replace(max_entries=10 ** 6)  # every entry, not just the TOP candidates
+        parse_cold.append(best_seconds(lambda: parse_feed(document, feed_source), args.repeat))
+        entry_cache = create_entry_cache()
+        items.extend(parse_feed(document, feed_source, entry_cache))
+        parse_warm.append(best_seconds(lambda: parse_feed(document, feed_source, entry_cache), args.repeat))
+    metrics["parse_feed_cold"] = metric(sum(parse_cold) / len(parse_cold) * 1e3, "ms/feed")
+    metrics["parse_feed_warm"] = metric(sum(parse_warm) / len(parse_warm) * 1e3, "ms/feed")
+
+    metrics["snapshot_build"] = metric(best_seconds(lambda: NewsSnapshot.build(1, items), args.repeat) * 1e3, "ms/snapshot")
+
+    snapshot = NewsSnapshot.build(1, items)
+    rng = random.Random(0)
+    metrics["select_top"] = metric(
+        best_seconds(lambda: registry.select(snapshot.stories_by_source, rng), args.repeat, number=1000) * 1e6, "us/selection",
+    )
+    metrics["top_response"] = metric(
+        best_seconds(lambda: build_top_news(snapshot, rng).model_dump_json(), args.repeat, number=100) * 1e6, "us/response",
+    )
+
+    emit(
+        "micro",
+        metrics,
+        {
+            "items": args.items,
+            "repeat": args.repeat,
+            "recorded_fixtures": [] if args.synthetic else sorted(recorded_fixtures()),
+            "entries": len(entries),
+            "snapshot_items": len(items),
+            "batch": args.batch,
+            "vector_category_agreement": round(agreement, 4),
+        },
+        args.output,
+    )
+
+if __name__ == "__main__":
+    main()
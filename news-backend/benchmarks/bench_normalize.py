@@ -0,0 +1,65 @@
+"""Compare the shared summary normalizer against the original per-entry truncation loop.
+
+Run from news-backend/:  python -m benchmarks.bench_normalize
+"""
+import random
+import re
+import timeit
+
+from app.normalize import normalize_summary
+
+SHORT_SUMMARY = "{title}に関するニュースです。"
+
+def legacy_normalize(summary: str, title: str) -> str:
+    """The loop formerly copy-pasted into both feed loops of fetch_rss_news()"""
+    summary = re.sub(r'<[^>]+>', '', summary)
+
+    if len(summary) > 300:
+        sentences = summary.split('。')
+        truncated = ""
+        for sentence in sentences:
+            if len(truncated + sentence + '。') <= 280:
+                truncated += sentence + '。'
+            else:
+                break
+        if truncated and len(truncated) > 100:
+            summary = truncated
+        else:
+            summary = summary[:280]
+    elif len(summary) < 50:
+        summary = SHORT_SUMMARY.format(title=title)
+    return summary
+
+def make_summary(rng: random.Random, length: int) -> str:
+    """Japanese prose with inline markup and sentences of varying length"""
+    words = ["政府は", "今日、", "東京都内で", "新たな方針を", "発表しました", "関係者によりますと", "<b>速報</b>", "<a href=\"#\">詳細</a>", "経済への影響が", "懸念されています"]
+    parts = []
+    size = 0
+    while size < length:
+        sentence = "".join(rng.choice(words) for _ in range(rng.randint(1, 12))) + "。"
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)
+
+def check_equivalence(rng: random.Random):
+    for _ in range(5000):
+        summary = make_summary(rng, rng.randint(0, 2000))
+        assert legacy_normalize(summary, "見出し") == normalize_summary(summary, "見出し", SHORT_SUMMARY)
+
+def per_call_us(func, summaries, repeat: int = 5) -> float:
+    best = min(timeit.repeat(lambda: [func(summary, "見出し") for summary in summaries], number=1, repeat=repeat))
+    return best / len(summaries) * 1e6
+
+def main():
+    rng = random.Random(0)
+    check_equivalence(rng)
+    print("equivalence: OK (5000 summaries)")
+
+    for length in (500, 5000, 50000):
+        summaries = [make_summary(rng, length) for _ in range(200)]
+        legacy_us = per_call_us(legacy_normalize, summaries)
+        shared_us = per_call_us(lambda summary, title: normalize_summary(summary, title, SHORT_SUMMARY), summaries)
+        print(f"{length:>6} chars  legacy {legacy_us:9.2f} us  shared {shared_us:9.2f} us  speedup {legacy_us / shared_us:6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Streaming fast-path parser (app.fastfeed) against feedparser, reported as JSON.
+
+Run from news-backend/:  python -m benchmarks.bench_parse [--json results.json]
+
+Every feed of the bundled registry is parsed from its fixture (recorded feeds
+when present, synthetic ones otherwise) with both parsers, at the feed's own
+max_entries and for all entries. Before timing, the entries of both are checked
+to give the same NewsItems and entry cache keys; a mismatch or a document the
+fast path hands back to feedparser is reported in the parameters.
+"""
+import argparse
+import timeit
+from typing import Callable, Dict, List
+
+import feedparser
+
+from app.fastfeed import parse_entries
+from app.feeds import FeedSource, build_news_item, create_entry_cache, entry_cache_key, parse_feed
+from app.sources import SourceRegistry
+from benchmarks.feed_server import FIXTURE_NAMES, fixture_feeds, recorded_fixtures
+from benchmarks.results import emit, metric
+
+def best_seconds(func: Callable[[], object], repeat: int, number: int = 1) -> float:
+    """Fastest of `repeat` runs of `number` calls, per call"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def mismatches(document: bytes, feed_source: FeedSource) -> List[str]:
+    """Fields in which the fast path's entries differ from feedparser's"""
+    fast = parse_entries(document, feed_source.max_entries)
+    if fast is None:
+        return ["fallback"]
+    slow = feedparser.parse(document).entries[:feed_source.max_entries]
+    if len(fast) != len(slow):
+        return [f"{len(fast)} entries instead of {len(slow)}"]
+    problems = []
+    for index, (a, b) in enumerate(zip(fast, slow)):
+        if entry_cache_key(a, feed_source) != entry_cache_key(b, feed_source):
+            problems.append(f"entry {index}: cache key")
+        # entries without a date get the build time; compare everything else
+        item_a, item_b = build_news_item(a, feed_source), build_news_item(b, feed_source)
+        if item_a.model_dump(exclude={"published"}) != item_b.model_dump(exclude={"published"}) or ("published" in a) != ("published" in b):
+            problems.append(f"entry {index}: NewsItem")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=40, help="entries per synthetic feed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    parser.add_argument("--json", dest="output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    feeds = fixture_feeds(items=args.items, recorded=not args.synthetic)
+    timings: Dict[str, List[float]] = {}
+    problems: Dict[str, List[str]] = {}
+    for feed in SourceRegistry.load().feeds:
+        document = feeds[FIXTURE_NAMES[feed.url]]
+        everything = feed._replace(max_entries=10 ** 6)
+        for feed_source in (feed, everything):
+            found = mismatches(document, feed_source)
+            if found:
+                problems.setdefault(FIXTURE_NAMES[feed.url], []).extend(found)
+
+        def record(name: str, func: Callable[[], object]) -> None:
+            timings.setdefault(name, []).append(best_seconds(func, args.repeat))
+
+        record("feedparser_capped", lambda: feedparser.parse(document).entries[:feed.max_entries])
+        record("fast_capped", lambda: parse_entries(document, feed.max_entries))
+        record("feedparser_all", lambda: feedparser.parse(document).entries)
+        record("fast_all", lambda: parse_entries(document, everything.max_entries))
+        # what a refresh of an unchanged feed costs: parse plus entry-cache hits
+        for name, feed_source in (("feedparser", feed), ("fast", feed._replace(parser="fast"))):
+            entry_cache = create_entry_cache()
+            parse_feed(document, feed_source, entry_cache)
+            record(f"parse_feed_{name}_warm", lambda: parse_feed(document, feed_source, entry_cache))
+
+    metrics = {name: metric(sum(values) / len(values) * 1e3, "ms/feed") for name, values in timings.items()}
+    for scope in ("capped", "all"):
+        metrics[f"speedup_{scope}"] = metric(
+            metrics[f"feedparser_{scope}"]["value"] / metrics[f"fast_{scope}"]["value"], "x", better="higher",
+        )
+
+    emit(
+        "parse",
+        metrics,
+        {
+            "items": args.items,
+            "repeat": args.repeat,
+            "recorded_fixtures": [] if args.synthetic else sorted(recorded_fixtures()),
+            "mismatches": problems,
+        },
+        args.output,
+    )
+
+if __name__ == "__main__":
+    main()
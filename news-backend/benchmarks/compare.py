@@ -0,0 +1,39 @@
+"""Compare two benchmark result files written with --json.
+
+Run from news-backend/:  python -m benchmarks.compare base.json head.json [--threshold 0.1]
+
+Prints every metric present in both files with its relative change and exits
+with status 1 when any metric got worse by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change that counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    print(f"{base['benchmark']}: {(base['environment']['commit'] or '?')[:10]} -> {(head['environment']['commit'] or '?')[:10]}")
+
+    regressions = 0
+    for name, before in base["metrics"].items():
+        after = head["metrics"].get(name)
+        if after is None:
+            continue
+        old, new = before["value"], after["value"]
+        change = (new - old) / old if old else 0.0
+        worse = change > args.threshold if before["better"] == "lower" else change < -args.threshold
+        regressions += worse
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<24} {old:>12.3f} -> {new:>12.3f} {before['unit']:<13} {change:+7.1%}{flag}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
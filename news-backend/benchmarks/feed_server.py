@@ -0,0 +1,245 @@
+"""Local feed server and fixtures, so benchmarks never depend on the live NHK/Nikkei feeds.
+
+Feeds are either recorded copies of the real ones (benchmarks/fixtures/*.xml,
+written by `python -m benchmarks.record_fixtures`) or synthetic documents in
+the same RSS 2.0 shape. The server can add latency and fail a share of
+requests, and answers conditional GETs like the real feeds do.
+
+Serve the fixtures by hand from news-backend/:  python -m benchmarks.feed_server --port 8900
+"""
+import argparse
+import hashlib
+import json
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from app.classify import CATEGORY_RULES, IMAGE_RULES, TOPIC_RULES
+from app.sources import SourceRegistry
+
+FIXTURES_DIR = Path(__file__).with_name("fixtures")
+
+# Bundled registry feed URL -> fixture name
+FIXTURE_NAMES = {
+    "https://www3.nhk.or.jp/rss/news/cat6.xml": "nhk-cat6",
+    "https://www3.nhk.or.jp/rss/news/cat7.xml": "nhk-cat7",
+    "https://www3.nhk.or.jp/rss/news/cat0.xml": "nhk-cat0",
+    "https://www3.nhk.or.jp/rss/news/cat1.xml": "nhk-cat1",
+    "https://asia.nikkei.com/rss/feed/nar": "nikkei-nar",
+}
+
+_FILLER = ["政府は", "今日、", "東京都内で", "新たな方針を", "発表しました", "関係者によりますと", "経済への影響が", "懸念されています", "全国で", "今後の見通しについて"]
+_ENGLISH = ["Japan", "Tokyo", "markets", "rally", "as", "investors", "weigh", "policy", "outlook", "China", "trade", "talks", "tech", "shares", "slide"]
+
+def _keywords():
+    return sorted({keyword for rule in CATEGORY_RULES + IMAGE_RULES + TOPIC_RULES for keyword in rule.keywords})
+
+def synthetic_rss(name: str, items: int = 40, summary_length: int = 200, seed: int = 0) -> bytes:
+    """RSS 2.0 document shaped like the NHK (Japanese) or Nikkei Asia (English) feed named `name`"""
+    rng = random.Random(f"{name}:{seed}")
+    nikkei = name.startswith("nikkei")
+    keywords = _keywords()
+    now = datetime(2025, 7, 1, 12, 0, tzinfo=timezone(timedelta(hours=9)))
+    entries = []
+    for i in range(items):
+        if nikkei:
+            title = " ".join(rng.choice(_ENGLISH) for _ in range(rng.randint(5, 10))).capitalize()
+            words = []
+            while sum(len(word) + 1 for word in words) < summary_length:
+                words.append(rng.choice(_ENGLISH))
+            summary = f"<p>{escape(' '.join(words))}.</p>"
+            link = f"https://asia.nikkei.com/Business/{name}-{seed}-{i}"
+        else:
+            title = "".join(rng.sample(keywords, rng.randint(1, 3)) + rng.sample(_FILLER, rng.randint(1, 3)))
+            summary = ""
+            while len(summary) < summary_length:
+                summary += "".join(rng.choice(_FILLER) for _ in range(rng.randint(2, 6))) + "。"
+            link = f"https://www3.nhk.or.jp/news/html/20250701/{name}-{seed}-{i:04d}.html"
+        published = format_datetime(now - timedelta(minutes=7 * i + rng.randint(0, 6)))
+        entries.append(
+            "<item>"
+            f"<title>{escape(title)}</title><link>{link}</link><guid>{link}</guid>"
+            f"<pubDate>{published}</pubDate><description>{escape(summary)}</description>"
+            "</item>"
+        )
+    channel = "Nikkei Asia" if nikkei else "NHKニュース"
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        f"<title>{channel}</title><link>https://example.com/{name}</link><description>{name}</description>"
+        + "".join(entries)
+        + "</channel></rss>\n"
+    ).encode()
+
+def recorded_fixtures() -> Dict[str, bytes]:
+    """Every recorded feed in benchmarks/fixtures/, by fixture name"""
+    return {path.stem: path.read_bytes() for path in sorted(FIXTURES_DIR.glob("*.xml"))}
+
+def fixture_feeds(items: int = 40, summary_length: int = 200, seed: int = 0, recorded: bool = True) -> Dict[str, bytes]:
+    """One document per bundled feed: the recorded copy when there is one, otherwise synthetic"""
+    feeds = {name: synthetic_rss(name, items, summary_length, seed) for name in FIXTURE_NAMES.values()}
+    if recorded:
+        feeds.update(recorded_fixtures())
+    return feeds
+
+class FeedServer:
+    """Threaded HTTP server for feed documents with injected latency and failures.
+
+    Each request waits `latency` seconds plus up to `jitter` more, and fails with a
+    503 with probability `failure_rate`. Documents carry an ETag, and a matching
+    If-None-Match gets a 304.
+    """
+
+    def __init__(
+        self,
+        feeds: Mapping[str, bytes],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.feeds = dict(feeds)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self.not_modified = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._etags = {name: '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"' for name, body in self.feeds.items()}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/feeds/{name}.xml"
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def start(self) -> "FeedServer":
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FeedServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _decide(self) -> Tuple[float, bool]:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        return delay, fail
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, fail = server._decide()
+                if delay:
+                    time.sleep(delay)
+                name = self.path.split("?", 1)[0].removeprefix("/feeds/").removesuffix(".xml")
+                if name not in server.feeds:
+                    self.send_error(404)
+                    return
+                if fail:
+                    self.send_error(503)
+                    return
+                etag = server._etags[name]
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                body = server.feeds[name]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def write_sources_file(server: FeedServer, refresh_interval: Optional[float] = None, path: Optional[str] = None, parser: Optional[str] = None) -> str:
+    """Copy the bundled registry with every feed pointed at `server`; returns the file's path"""
+    lines = []
+    for source in SourceRegistry.load().sources:
+        lines += ["[[sources]]", f"label = {json.dumps(source.label, ensure_ascii=False)}", f"priority = {source.priority}", f"quota = {source.quota}", ""]
+        for feed in source.feeds:
+            lines += [
+                "[[sources.feeds]]",
+                f"url = {json.dumps(server.url(FIXTURE_NAMES.get(feed.url, feed.url.rsplit('/', 1)[-1])))}",
+                f"max_entries = {feed.max_entries}",
+                f"refresh_interval = {refresh_interval if refresh_interval is not None else feed.refresh_interval}",
+                f"short_summary = {json.dumps(feed.short_summary, ensure_ascii=False)}",
+                f"timeout = {feed.timeout}",
+                f"max_staleness = {feed.max_staleness}",
+                f"parser = {json.dumps(parser or feed.parser)}",
+                "",
+            ]
+    if path is None:
+        handle, path = tempfile.mkstemp(prefix="bench-sources-", suffix=".toml")
+        with open(handle, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+    else:
+        Path(path).write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--items", type=int, default=40, help="entries per synthetic feed")
+    parser.add_argument("--summary-length", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    parser.add_argument("--sources-file", help="also write a registry pointing at this server here")
+    args = parser.parse_args()
+
+    feeds = fixture_feeds(args.items, args.summary_length, recorded=not args.synthetic)
+    server = FeedServer(feeds, args.latency, args.jitter, args.failure_rate, port=args.port)
+    if args.sources_file:
+        write_sources_file(server, path=args.sources_file)
+        print(f"registry written to {args.sources_file} (use NEWS_SOURCES_FILE={args.sources_file})")
+    for name in feeds:
+        print(server.url(name))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Record the live feeds of the bundled registry as benchmark fixtures.
+
+Run from news-backend/:  python -m benchmarks.record_fixtures
+
+Each feed is saved as benchmarks/fixtures/<name>.xml (names in
+benchmarks.feed_server.FIXTURE_NAMES). Benchmarks prefer recorded fixtures to
+synthetic ones, so re-record when the real feeds change shape.
+"""
+import httpx
+
+from app.sources import SourceRegistry
+from benchmarks.feed_server import FIXTURE_NAMES, FIXTURES_DIR
+
+def main():
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    with httpx.Client(follow_redirects=True, headers={"User-Agent": "news-backend/0.1"}, timeout=30) as client:
+        for feed in SourceRegistry.load().feeds:
+            name = FIXTURE_NAMES.get(feed.url, feed.url.rstrip("/").rsplit("/", 1)[-1])
+            try:
+                response = client.get(feed.url)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"{feed.url}: {e!r}")
+                continue
+            path = FIXTURES_DIR / f"{name}.xml"
+            path.write_bytes(response.content)
+            print(f"{feed.url} -> {path} ({len(response.content)} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Machine-readable benchmark results, so runs on different commits can be compared.
+
+Every benchmark reports a flat mapping of metric name to
+{"value": ..., "unit": ..., "better": "lower" | "higher"}; see benchmarks.compare.
+"""
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+def metric(value: float, unit: str, better: str = "lower") -> Dict[str, object]:
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty sequence"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ("git",) + args, capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> Dict[str, object]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def emit(benchmark: str, metrics: Dict[str, Dict[str, object]], parameters: Dict[str, object], path: Optional[str] = None) -> None:
+    """Write the results as JSON to `path`, or to stdout when no path is given"""
+    document = json.dumps(
+        {"benchmark": benchmark, "environment": environment(), "parameters": parameters, "metrics": metrics},
+        ensure_ascii=False,
+        indent=2,
+    )
+    if path:
+        Path(path).write_text(document + "\n", encoding="utf-8")
+    else:
+        print(document)
@@ -0,0 +1,12 @@
+from app.models import NewsItem
+
+def make_item(
+    url: str = "https://example.com/1",
+    published: str = "Mon, 06 Jan 2025 10:00:00 GMT",
+    title: str = "見出し",
+    summary: str = "要約",
+    source: str = "NHKニュース",
+    category: str = "政治",
+) -> NewsItem:
+    """A NewsItem with defaults for every field the test does not care about"""
+    return NewsItem(title=title, summary=summary, published=published, source=source, url=url, image_url="https://example.com/a.jpg", category=category)
@@ -0,0 +1,67 @@
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main
+from app.http_cache import CACHE_CONTROL
+from app.snapshot import NewsSnapshot
+from tests.conftest import make_item
+
+@pytest.fixture
+def snapshots(monkeypatch):
+    """Serve a snapshot built here instead of running the feed refresher"""
+    holder = types.SimpleNamespace(snapshot=build_snapshot(1))
+    monkeypatch.setattr(app.main, "snapshots", holder)
+    return holder
+
+@pytest.fixture
+def client(snapshots):
+    # not entered as a context manager, so the lifespan (and its feed fetches) never runs
+    return TestClient(app.main.app)
+
+def build_snapshot(version: int) -> NewsSnapshot:
+    return NewsSnapshot.build(version, [
+        make_item(f"https://example.com/{i}", f"Mon, 06 Jan 2025 {i:02d}:00:00 GMT", title=f"見出し{i}", source=source)
+        for i, source in enumerate(["NHKニュース", "Yahoo!ニュース", "日経", "NHKニュース", "日経", "朝日新聞"] * 2)
+    ])
+
+def test_news_has_etag_and_cache_control(client):
+    response = client.get("/api/news", params={"variant": 3})
+    assert response.status_code == 200
+    assert response.json()["success"]
+    assert response.headers["etag"].startswith('"1-')
+    assert response.headers["cache-control"] == CACHE_CONTROL
+    assert client.get("/api/news", params={"variant": 3}).content == response.content
+
+def test_matching_etag_gets_304(client):
+    etag = client.get("/api/news", params={"variant": 3}).headers["etag"]
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/api/news", params={"variant": 3}, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == CACHE_CONTROL
+
+def test_unqualified_request_matches_any_variant(client):
+    for variant in range(app.main.TOP_VARIANTS):
+        etag = client.get("/api/news", params={"variant": variant}).headers["etag"]
+        response = client.get("/api/news", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+def test_new_snapshot_invalidates_etag(client, snapshots):
+    etag = client.get("/api/news", params={"variant": 0}).headers["etag"]
+    snapshots.snapshot = build_snapshot(2)
+    response = client.get("/api/news", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"2-')
+
+def test_pages_are_cached_per_query(client):
+    response = client.get("/api/news", params={"source": "日経", "limit": 2})
+    assert response.status_code == 200
+    assert [item["source"] for item in response.json()["data"]] == ["日経", "日経"]
+    etag = response.headers["etag"]
+    assert client.get("/api/news", params={"source": "日経", "limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+    other = client.get("/api/news", params={"source": "日経", "limit": 3}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
@@ -0,0 +1,48 @@
+from app.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=60, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_probe_closes_on_success():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=60, clock=clock)
+    breaker.record_failure()
+    clock.now = 59.9
+    assert breaker.state == OPEN
+    clock.now = 60.0
+    assert breaker.state == HALF_OPEN and breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_failed_probes_back_off_up_to_the_maximum():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=60, max_open_seconds=200, clock=clock)
+    breaker.record_failure()
+    clock.now = 60.0
+    for open_for in (120.0, 200.0, 200.0):
+        assert breaker.state == HALF_OPEN
+        breaker.record_failure()
+        probe_at = clock.now
+        clock.now = probe_at + open_for - 0.1
+        assert breaker.state == OPEN
+        clock.now = probe_at + open_for
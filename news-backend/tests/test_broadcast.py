@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from app.broadcast import NewsBroadcaster
+from app.snapshot import NewsSnapshot
+from tests.conftest import make_item
+
+def published_urls(queue: "asyncio.Queue[str]"):
+    urls = []
+    while not queue.empty():
+        data = next(line for line in queue.get_nowait().splitlines() if line.startswith("data: "))
+        urls.append([item["url"] for item in json.loads(data[len("data: "):])])
+    return urls
+
+def test_articles_are_announced_once():
+    broadcaster = NewsBroadcaster()
+    a, b, c = make_item("https://example.com/a"), make_item("https://example.com/b"), make_item("https://example.com/c")
+    snapshots = [
+        NewsSnapshot.build(0, [a]),
+        NewsSnapshot.build(1, [a, b]),
+        NewsSnapshot.build(2, [a]),  # b rotated out (or dropped as stale)
+        NewsSnapshot.build(3, [a, b, c]),  # and back, together with a new article
+    ]
+    with broadcaster.subscribe() as queue:
+        for previous, current in zip(snapshots, snapshots[1:]):
+            broadcaster.on_snapshot(previous, current)
+        assert published_urls(queue) == [["https://example.com/b"], ["https://example.com/c"]]
+
+def test_urls_seen_without_subscribers_are_not_announced_later():
+    broadcaster = NewsBroadcaster()
+    a, b = make_item("https://example.com/a"), make_item("https://example.com/b")
+    broadcaster.on_snapshot(NewsSnapshot.build(0, []), NewsSnapshot.build(1, [a]))
+    with broadcaster.subscribe() as queue:
+        broadcaster.on_snapshot(NewsSnapshot.build(1, []), NewsSnapshot.build(2, [a, b]))
+        assert published_urls(queue) == [["https://example.com/b"]]
+
+def test_seen_urls_are_bounded():
+    broadcaster = NewsBroadcaster(seen_size=2)
+    items = [make_item(f"https://example.com/{index}") for index in range(3)]
+    empty = NewsSnapshot.build(0, [])
+    for version, item in enumerate(items, 1):
+        broadcaster.on_snapshot(empty, NewsSnapshot.build(version, [item]))
+    with broadcaster.subscribe() as queue:
+        broadcaster.on_snapshot(empty, NewsSnapshot.build(4, [items[0]]))
+        assert published_urls(queue) == [["https://example.com/0"]]
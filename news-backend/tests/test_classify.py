@@ -0,0 +1,22 @@
+from app.classify import classify_batch, classify_title, get_news_category, get_news_related_image, get_news_topic
+from benchmarks import legacy_classify
+from benchmarks.bench_classify import make_titles
+
+EDGE_TITLES = ["", "M谷氏", "BREAKING: COVID vaccine", "日本銀行と中国の首脳会談", "   "]
+
+def legacy(title: str):
+    return (
+        legacy_classify.get_news_category(title),
+        legacy_classify.get_news_related_image(title),
+        legacy_classify.get_news_topic(title),
+    )
+
+def test_matches_legacy_chains():
+    for title in make_titles(5000, seed=1) + EDGE_TITLES:
+        expected = legacy(title)
+        assert tuple(classify_title(title)) == expected, title
+        assert (get_news_category(title), get_news_related_image(title), get_news_topic(title)) == expected, title
+
+def test_rules_batch_matches_legacy_chains():
+    titles = make_titles(500, seed=2) + EDGE_TITLES
+    assert [tuple(result) for result in classify_batch(titles, engine="rules")] == [legacy(title) for title in titles]
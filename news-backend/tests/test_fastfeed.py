@@ -0,0 +1,85 @@
+import feedparser
+import pytest
+
+from app.fastfeed import parse_entries
+
+FIELDS = ("title", "link", "id", "published", "summary")
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>NHKニュース</title><link>https://example.com/</link>
+<item>
+  <title>首相が会見 &amp; 質疑</title>
+  <link>https://example.com/news/1.html</link>
+  <guid>https://example.com/news/1.html</guid>
+  <pubDate>Mon, 06 Jan 2025 10:00:00 +0900</pubDate>
+  <description>&lt;p&gt;政府は&lt;b&gt;6日&lt;/b&gt;、会見を開いた。&lt;/p&gt;</description>
+</item>
+<item>
+  <title>株価が上昇</title>
+  <link>https://example.com/news/2.html</link>
+  <description><![CDATA[東証の<a href="https://example.com/">株価</a>が上昇。]]></description>
+</item>
+<item>
+  <title>日付のない記事</title>
+  <link>https://example.com/news/3.html</link>
+  <guid isPermaLink="false">news-3</guid>
+</item>
+</channel></rss>
+"""
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Nikkei Asia</title><id>urn:feed</id>
+<updated>2025-01-06T10:00:00Z</updated>
+<entry>
+  <title>Markets rally</title>
+  <link rel="alternate" href="https://example.com/a/1"/>
+  <link rel="enclosure" href="https://example.com/a/1.jpg"/>
+  <id>urn:entry:1</id>
+  <published>2025-01-06T10:00:00Z</published>
+  <updated>2025-01-06T11:00:00Z</updated>
+  <summary type="html">&lt;p&gt;Stocks &lt;em&gt;rose&lt;/em&gt;.&lt;/p&gt;</summary>
+</entry>
+<entry>
+  <title type="text">Yen weakens</title>
+  <link href="https://example.com/a/2"/>
+  <id>urn:entry:2</id>
+  <updated>2025-01-06T09:00:00Z</updated>
+  <content type="html">&lt;p&gt;The yen fell.&lt;/p&gt;</content>
+</entry>
+</feed>
+"""
+
+def rss_item(body: str) -> bytes:
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title><item>{body}</item></channel></rss>'.encode()
+
+def fields(entries):
+    return [{field: entry.get(field) for field in FIELDS} for entry in entries]
+
+@pytest.mark.parametrize("document", [RSS, ATOM], ids=["rss", "atom"])
+@pytest.mark.parametrize("limit", [1, 2, 100])
+def test_matches_feedparser(document, limit):
+    content = document.encode()
+    fast = parse_entries(content, limit)
+    assert fast is not None
+    assert fields(fast) == fields(feedparser.parse(content).entries[:limit])
+
+@pytest.mark.parametrize("content", [
+    pytest.param(RSS.encode()[:-40], id="truncated"),
+    pytest.param(rss_item("<title>a &nbsp; b</title><link>https://example.com/1</link>"), id="undefined-entity"),
+    pytest.param(rss_item(
+        "<title>t</title><link>https://example.com/1</link>"
+        "<description>&lt;script&gt;alert(1)&lt;/script&gt;本文</description>"
+    ), id="script"),
+    pytest.param(rss_item("<title>t</title><link>/news/1.html</link>"), id="relative-link"),
+    pytest.param(rss_item("<title>t</title><link>https://example.com/1</link><link>https://example.com/2</link>"), id="repeated"),
+    pytest.param(rss_item("<title>t<b>x</b></title><link>https://example.com/1</link>"), id="markup"),
+    pytest.param(
+        '<?xml version="1.0" encoding="Shift_JIS"?><rss version="2.0"><channel><item><title>政治</title>'
+        "<link>https://example.com/1</link></item></channel></rss>".encode("shift_jis"),
+        id="shift_jis",
+    ),
+    pytest.param(b'<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/>', id="rss1"),
+    pytest.param(b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title></channel></rss>', id="empty"),
+])
+def test_falls_back_to_feedparser(content):
+    assert parse_entries(content, 10) is None
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from app.breaker import OPEN
+from app.feeds import FeedSource, FeedState
+from app.refresher import FeedRefresher
+from tests.conftest import make_item
+
+def feed_source(**kwargs) -> FeedSource:
+    return FeedSource(
+        url="https://example.com/feed", source="NHKニュース", max_entries=10,
+        refresh_interval=60.0, short_summary="", **kwargs,
+    )
+
+def failing_fetch(calls):
+    async def fetch(client, feed_source, previous, entry_cache):
+        calls.append(feed_source.url)
+        raise RuntimeError("upstream down")
+    return fetch
+
+class FakeStore:
+    def __init__(self, items):
+        self.items = items
+
+    def recent(self, limit=50, feed=None):
+        return self.items[:limit]
+
+    def upsert(self, items, feed=""):
+        pass
+
+def test_warm_articles_expire_after_max_staleness(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.refresher.fetch_feed", failing_fetch(calls))
+    source = feed_source(max_staleness=60.0)
+    refresher = FeedRefresher([source], store=FakeStore([make_item()]))
+
+    async def run():
+        await refresher._load_warm()
+        refresher._publish()
+        assert len(refresher.snapshot.items) == 1
+        await refresher.refresh(source)
+        assert len(refresher.snapshot.items) == 1
+        refresher._warm[source.url] = refresher._warm[source.url]._replace(fetched_at=time.time() - 61)
+        await refresher.refresh(source)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert refresher.snapshot.items == ()
+
+def test_concurrent_refreshes_share_one_fetch(monkeypatch):
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch(client, feed_source, previous, entry_cache):
+        calls.append(feed_source.url)
+        await release.wait()
+        return FeedState(items=(make_item(),))
+
+    monkeypatch.setattr("app.refresher.fetch_feed", fetch)
+    source = feed_source()
+    refresher = FeedRefresher([source])
+
+    async def run():
+        waiting = [asyncio.create_task(refresher.refresh(source)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiting)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert len(refresher.snapshot.items) == 1
+
+def test_failing_feed_keeps_its_entries_until_max_staleness(monkeypatch):
+    source = feed_source(max_staleness=60.0)
+    refresher = FeedRefresher([source])
+    calls = []
+
+    async def succeed(client, feed_source, previous, entry_cache):
+        return FeedState(items=(make_item(),))
+
+    async def run():
+        monkeypatch.setattr("app.refresher.fetch_feed", succeed)
+        await refresher.refresh(source)
+        monkeypatch.setattr("app.refresher.fetch_feed", failing_fetch(calls))
+        await refresher.refresh(source)
+        assert len(refresher.snapshot.items) == 1
+        refresher._results[source.url] = refresher._results[source.url]._replace(fetched_at=time.time() - 61)
+        await refresher.refresh(source)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert refresher.snapshot.items == ()
+
+def test_open_breaker_skips_the_fetch(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.refresher.fetch_feed", failing_fetch(calls))
+    source = feed_source()
+    refresher = FeedRefresher([source])
+
+    async def run():
+        for _ in range(5):
+            await refresher.refresh(source)
+
+    asyncio.run(run())
+    # the third failure opens the breaker for twice the refresh interval
+    assert len(calls) == 3
+    assert refresher._breakers[source.url].state == OPEN
@@ -0,0 +1,51 @@
+import marshal
+import zlib
+from array import array
+
+from app.search import NgramIndex
+from tests.conftest import make_item
+
+def build_index() -> NgramIndex:
+    index = NgramIndex()
+    index.add([
+        make_item("https://example.com/0", title="株価が上昇"),
+        make_item("https://example.com/1", title="政府が発表", summary="株式市場に影響"),
+        make_item("https://example.com/2", title="野球の試合"),
+        make_item("https://example.com/3", title="株主総会を開催"),
+    ], published=[0.0, 1.0, 2.0, 3.0])
+    return index
+
+def test_single_character_query_uses_unigrams():
+    results = build_index().search("株")
+    # title matches first, newer first among equal scores, then the summary match
+    assert [item.url for item in results.items] == ["https://example.com/3", "https://example.com/0", "https://example.com/1"]
+    assert results.total == 3
+
+def test_paging_and_terms():
+    index = build_index()
+    assert [item.url for item in index.search("株", offset=1, limit=1).items] == ["https://example.com/0"]
+    assert [item.url for item in index.search("株 政府").items] == ["https://example.com/1"]
+    assert index.search("存在しない").total == 0
+
+def test_load_reindexes_files_without_unigram_postings(tmp_path):
+    items = [make_item("https://example.com/0", title="株価が上昇"), make_item("https://example.com/1", title="野球の試合")]
+    data = {
+        "items": [(item.title, item.summary, item.published, item.source, item.url, item.image_url, item.category) for item in items],
+        "published": array("d", [0.0, 1.0]).tobytes(),
+        "postings": {},
+        "itemsize": array("I").itemsize,
+    }
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"NGIDX1\n" + zlib.compress(marshal.dumps(data)))
+
+    index = NgramIndex.load(str(path))
+    assert [item.url for item in index.search("株").items] == ["https://example.com/0"]
+    assert index.dirty
+    index.save(str(path))
+    assert [item.url for item in NgramIndex.load(str(path)).search("野球").items] == ["https://example.com/1"]
+
+def test_common_terms_score_only_the_newest_candidates(monkeypatch):
+    monkeypatch.setattr("app.search.MAX_CANDIDATES", 2)
+    results = build_index().search("株")
+    assert [item.url for item in results.items] == ["https://example.com/3", "https://example.com/1"]
+    assert results.total == 2
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from app.feeds import FeedSource, FeedState
+from app.refresher import FeedRefresher
+from app.shared import SNAPSHOT_FILE, SharedSnapshot, read_snapshot_file, write_snapshot_file
+from app.snapshot import NewsSnapshot
+from tests.conftest import make_item
+
+SOURCE = FeedSource(
+    url="https://example.com/feed", source="NHKニュース", max_entries=10, refresh_interval=60.0, short_summary="",
+)
+
+async def failing_fetch(client, feed_source, previous, entry_cache):
+    raise RuntimeError("upstream down")
+
+def test_new_leader_keeps_the_last_shared_entries_during_an_outage(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.refresher.fetch_feed", failing_fetch)
+    items = (make_item(url="https://example.com/1"), make_item(url="https://example.com/2"))
+    feeds = {SOURCE.url: FeedState(items=items, fetched_at=time.time())}
+    write_snapshot_file(tmp_path / SNAPSHOT_FILE, 7, NewsSnapshot.build(7, items), feeds)
+    shared = SharedSnapshot(tmp_path, FeedRefresher([SOURCE]))
+
+    async def run():
+        await shared.start()
+        assert shared.is_leader
+        # the background refresh fails against the upstream
+        await asyncio.sleep(0.05)
+        await shared.stop()
+
+    asyncio.run(run())
+    assert shared.snapshot.version == 8
+    assert [item.url for item in shared.snapshot.items] == ["https://example.com/1", "https://example.com/2"]
+    assert [item.url for item in read_snapshot_file(tmp_path / SNAPSHOT_FILE).items] == [
+        "https://example.com/1", "https://example.com/2",
+    ]
+
+def test_new_leader_drops_shared_entries_past_max_staleness(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.refresher.fetch_feed", failing_fetch)
+    items = (make_item(),)
+    feeds = {SOURCE.url: FeedState(items=items, fetched_at=time.time() - SOURCE.max_staleness - 1)}
+    write_snapshot_file(tmp_path / SNAPSHOT_FILE, 1, NewsSnapshot.build(1, items), feeds)
+    shared = SharedSnapshot(tmp_path, FeedRefresher([SOURCE]))
+
+    async def run():
+        await shared.start()
+        await asyncio.sleep(0.05)
+        await shared.stop()
+
+    asyncio.run(run())
+    assert shared.snapshot.items == ()
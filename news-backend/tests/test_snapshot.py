@@ -0,0 +1,66 @@
+import pytest
+
+from app.snapshot import NewsSnapshot, article_id, decode_cursor, encode_cursor
+from tests.conftest import make_item
+
+def test_build_accepts_out_of_range_dates():
+    snapshot = NewsSnapshot.build(1, [
+        make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT"),
+        make_item("https://example.com/2", "0001-01-01"),
+        make_item("https://example.com/3", "9999-12-31T23:59:59-14:00"),
+    ])
+    assert len(snapshot.items) == 3
+
+def hourly_items(hours, **fields):
+    return [
+        make_item(f"https://example.com/{hour}", f"Mon, 06 Jan 2025 {hour:02d}:00:00 GMT", **fields) for hour in hours
+    ]
+
+def urls(items):
+    return [item.url for item in items]
+
+def test_cursor_round_trip():
+    key = (-1736157600.0, article_id("https://example.com/1"))
+    assert decode_cursor(encode_cursor(key)) == key
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+def test_pages_walk_every_article_newest_first():
+    snapshot = NewsSnapshot.build(1, hourly_items(range(10)))
+    seen, cursor = [], None
+    while True:
+        page = snapshot.page(3, cursor=cursor)
+        seen += urls(page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [f"https://example.com/{hour}" for hour in reversed(range(10))]
+
+def test_cursor_resumes_after_newer_articles_arrive():
+    first = NewsSnapshot.build(1, hourly_items(range(1, 6)))
+    page = first.page(2)
+    assert urls(page.items) == ["https://example.com/5", "https://example.com/4"]
+    second = NewsSnapshot.build(2, hourly_items(range(1, 6)) + hourly_items([0, 23]))
+    assert urls(second.page(2, cursor=page.next_cursor).items) == ["https://example.com/3", "https://example.com/2"]
+
+def test_category_and_source_filters_combine():
+    snapshot = NewsSnapshot.build(1, [
+        *hourly_items([1, 2, 3], category="政治", source="NHKニュース"),
+        *hourly_items([4, 5], category="政治", source="日経"),
+        *hourly_items([6, 7, 8, 9], category="経済", source="NHKニュース"),
+    ])
+    page = snapshot.page(2, category="政治", source="NHKニュース")
+    assert urls(page.items) == ["https://example.com/3", "https://example.com/2"]
+    page = snapshot.page(2, category="政治", source="NHKニュース", cursor=page.next_cursor)
+    assert urls(page.items) == ["https://example.com/1"]
+    assert page.next_cursor is None
+
+def test_no_cursor_when_no_remaining_article_matches():
+    snapshot = NewsSnapshot.build(1, [
+        *hourly_items([8, 9], category="政治", source="NHKニュース"),
+        *hourly_items([1, 2, 3], category="政治", source="日経"),
+        *hourly_items([4, 5, 6, 7, 10, 11], category="経済", source="NHKニュース"),
+    ])
+    page = snapshot.page(2, category="政治", source="NHKニュース")
+    assert urls(page.items) == ["https://example.com/9", "https://example.com/8"]
+    assert page.next_cursor is None
@@ -0,0 +1,81 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from app.store import SQLiteArticleStore
+from tests.conftest import make_item
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteArticleStore(str(tmp_path / "articles.db"))
+    store.init_schema()
+    yield store
+    store.close()
+
+def test_upsert_deduplicates_by_url(store):
+    written = store.upsert([
+        make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT", title="old"),
+        make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT", title="new"),
+        make_item("", "Mon, 06 Jan 2025 10:00:00 GMT"),
+    ])
+    assert written == 1
+    store.upsert([make_item("https://example.com/1", "Mon, 06 Jan 2025 11:00:00 GMT", title="newer")])
+
+    items = store.recent()
+    assert [(item.url, item.title, item.published) for item in items] == [
+        ("https://example.com/1", "newer", "Mon, 06 Jan 2025 11:00:00 GMT"),
+    ]
+
+def test_recent_is_newest_first_with_limit(store):
+    store.upsert([
+        make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT"),
+        make_item("https://example.com/3", "Mon, 06 Jan 2025 12:00:00 GMT"),
+        make_item("https://example.com/2", "2025-01-06T20:00:00+09:00"),  # 11:00 UTC
+    ])
+    assert [item.url for item in store.recent(limit=2)] == ["https://example.com/3", "https://example.com/2"]
+
+def test_recent_filters(store):
+    store.upsert([
+        make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT", category="政治"),
+        make_item("https://example.com/2", "Mon, 06 Jan 2025 11:00:00 GMT", category="スポーツ"),
+    ], feed="https://example.com/a.xml")
+    store.upsert([
+        make_item("https://example.com/3", "Mon, 06 Jan 2025 12:00:00 GMT", source="日経ニュース", category="政治"),
+    ], feed="https://example.com/b.xml")
+
+    assert [item.url for item in store.recent(category="政治")] == ["https://example.com/3", "https://example.com/1"]
+    assert [item.url for item in store.recent(source="NHKニュース")] == ["https://example.com/2", "https://example.com/1"]
+    assert [item.url for item in store.recent(feed="https://example.com/b.xml")] == ["https://example.com/3"]
+    assert [item.url for item in store.recent(category="政治", source="NHKニュース")] == ["https://example.com/1"]
+
+def test_recent_before_is_exclusive(store):
+    store.upsert([
+        make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT"),
+        make_item("https://example.com/2", "Mon, 06 Jan 2025 11:00:00 GMT"),
+        make_item("https://example.com/3", "Mon, 06 Jan 2025 12:00:00 GMT"),
+    ])
+    before = datetime(2025, 1, 6, 11, 0, tzinfo=timezone.utc)
+    assert [item.url for item in store.recent(before=before)] == ["https://example.com/1"]
+
+def test_upsert_survives_out_of_range_dates(store):
+    assert store.upsert([
+        make_item("https://example.com/1", "0001-01-01"),
+        make_item("https://example.com/2", "9999-12-31T23:59:59-14:00"),
+    ]) == 2
+    assert {item.url for item in store.recent()} == {"https://example.com/1", "https://example.com/2"}
+
+def test_init_schema_adds_feed_column_to_older_tables(tmp_path):
+    path = str(tmp_path / "articles.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL UNIQUE, title TEXT NOT NULL, "
+            "summary TEXT NOT NULL, published TEXT NOT NULL, published_at TEXT NOT NULL, source TEXT NOT NULL, "
+            "category TEXT NOT NULL, image_url TEXT NOT NULL, ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+    conn.close()
+    store = SQLiteArticleStore(path)
+    store.init_schema()
+    store.upsert([make_item("https://example.com/1", "Mon, 06 Jan 2025 10:00:00 GMT")], feed="https://example.com/a.xml")
+    assert [item.url for item in store.recent(feed="https://example.com/a.xml")] == ["https://example.com/1"]
+    store.close()
@@ -27,9 +27,10 @@ function App() {
   const [refreshing, setRefreshing] = useState(false)
   const [lastUpdated, setLastUpdated] = useState<string>('')
 
-  const fetchNews = async () => {
+  const fetchNews = async (variant?: number) => {
     try {
-      const response = await fetch(`${import.meta.env.VITE_API_URL}/api/news`)
+      const query = variant === undefined ? '' : `?variant=${variant}`
+      const response = await fetch(`${import.meta.env.VITE_API_URL}/api/news${query}`)
       const data: NewsResponse = await response.json()
       
       if (data.success) {
@@ -47,7 +48,8 @@ function App() {
 
   const handleRefresh = () => {
     setRefreshing(true)
-    fetchNews()
+    // a different variant is a different TOP6 pick of the same cached snapshot
+    fetchNews(Math.floor(Math.random() * 1000))
   }
 
   useEffect(() => {